@@ -0,0 +1,197 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from .browser import get_browser_pool, select_engine
+from .config import browser_settings, proxy_settings
+from .fingerprints import FingerprintProfile, random_profile
+from .proxies import get_proxy, get_proxy_pool
+from .storage_state import get_storage_states, site_of
+
+
+@dataclass
+class AffinityBinding:
+    """Proxy e perfil fixados para um domínio"""
+
+    domain: str
+    proxy: dict
+    profile: FingerprintProfile
+    requests: int = 0
+    bound_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def engine(self) -> str:
+        return self.profile.engine
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.bound_at
+
+
+class ProxyAffinity:
+    """
+    Mantém cada domínio no mesmo proxy e perfil de fingerprint por até
+    `max_requests` requisições ou `ttl` segundos.
+
+    Com proxy e perfil fixos, `BrowserPool.context(reuse=True)` devolve o mesmo
+    contexto estacionado (conexões TCP/TLS aquecidas) e o `StorageStateStore`
+    restaura os mesmos cookies, evitando refazer handshakes e desafios a cada
+    visita ao mesmo portal. O domínio só troca de proxy antes do prazo se a
+    saúde do proxy cair (quarentena ou taxa de sucesso abaixo de
+    `min_success_rate`, ver `ProxyPool`).
+
+    Vínculos expirados são descartados e, acima de `max_bindings`, os domínios
+    usados há mais tempo saem primeiro.
+
+    Args:
+        max_requests: Requisições por vínculo. Se None, usa `ProxySettings.affinity_max_requests`
+        ttl: Duração (s) máxima de um vínculo
+        min_success_rate: Taxa de sucesso mínima do proxy vinculado
+        max_bindings: Número máximo de vínculos mantidos
+    """
+
+    def __init__(
+        self,
+        max_requests: int | None = None,
+        ttl: float | None = None,
+        min_success_rate: float | None = None,
+        max_bindings: int | None = None,
+    ):
+        self.max_requests = max_requests or proxy_settings.affinity_max_requests
+        self.ttl = ttl or proxy_settings.affinity_ttl
+        self.min_success_rate = (
+            proxy_settings.affinity_min_success_rate
+            if min_success_rate is None
+            else min_success_rate
+        )
+        self.max_bindings = max_bindings or proxy_settings.affinity_max_bindings
+        self.failovers = 0
+        self.rotations = 0
+        self._bindings: OrderedDict[tuple[str, str], AffinityBinding] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def _healthy(self, binding: AffinityBinding) -> bool:
+        health = get_proxy_pool().health.get(binding.proxy["server"])
+        if health is None:
+            return True
+        return not health.quarantined() and health.success_rate >= self.min_success_rate
+
+    def _expired(self, binding: AffinityBinding) -> bool:
+        return binding.requests >= self.max_requests or binding.age >= self.ttl
+
+    async def _bind(self, domain: str, site: str, engine: str, engines):
+        proxy = await get_proxy(test=False)
+
+        if engine == "auto":
+            engine = select_engine(site, engines)
+        elif engine == "random":
+            engine = random.choice(engines)
+
+        # Prefere o perfil que já tem cookies salvos para o site e o proxy
+        profile = None
+        if browser_settings.storage_state:
+            profile = get_storage_states().profile_for(site, proxy, (engine,))
+
+        return AffinityBinding(
+            domain=domain, proxy=proxy, profile=profile or random_profile(engine)
+        )
+
+    async def get(
+        self, site: str, engine: str = "firefox", engines=("firefox", "chromium")
+    ) -> AffinityBinding:
+        """
+        Vínculo atual do domínio de `site`, criando um novo se não existir,
+        tiver expirado ou se o proxy perdeu a saúde.
+
+        Args:
+            site: URL ou host visitado
+            engine: "firefox", "chromium", "random" ou "auto" (resolvida só ao
+                criar o vínculo)
+            engines: Engines disponíveis para "random" e "auto"
+        """
+        domain = site_of(site)
+        key = (domain, engine)
+
+        async with self._lock:
+            binding = self._bindings.get(key)
+            if binding is not None:
+                if not self._healthy(binding):
+                    self.failovers += 1
+                    logger.info(f"Proxy de {domain} perdeu saúde; trocando")
+                elif self._expired(binding):
+                    self.rotations += 1
+                else:
+                    binding.requests += 1
+                    self._bindings.move_to_end(key)
+                    return binding
+
+            binding = await self._bind(domain, site, engine, engines)
+            binding.requests += 1
+            self._bindings[key] = binding
+            self._bindings.move_to_end(key)
+            self._evict()
+            return binding
+
+    def _evict(self):
+        for key in [k for k, b in self._bindings.items() if b.age >= self.ttl]:
+            del self._bindings[key]
+        while len(self._bindings) > self.max_bindings:
+            self._bindings.popitem(last=False)
+
+    def forget(self, site: str):
+        """Descarta os vínculos do domínio de `site`"""
+        domain = site_of(site)
+        for key in [key for key in self._bindings if key[0] == domain]:
+            del self._bindings[key]
+
+    @asynccontextmanager
+    async def context(self, site: str, engine: str = "firefox", pool=None):
+        """
+        Contexto do pool com o proxy e o perfil vinculados ao domínio, guardado
+        para reuso ao sair do bloco.
+
+        Args:
+            site: URL ou host a visitar
+            engine: Ver `get`
+            pool: Pool de navegadores. Se None, usa `get_browser_pool()`
+        """
+        pool = pool or await get_browser_pool()
+        binding = await self.get(site, engine, pool.engines)
+
+        async with pool.context(
+            binding.engine,
+            proxy=binding.proxy,
+            profile=binding.profile,
+            reuse=True,
+            site=site,
+        ) as context:
+            yield context
+
+    def stats(self) -> dict:
+        return {
+            "bindings": len(self._bindings),
+            "failovers": self.failovers,
+            "rotations": self.rotations,
+            "requests": {
+                f"{domain}:{engine}": binding.requests
+                for (domain, engine), binding in self._bindings.items()
+            },
+        }
+
+
+_proxy_affinity: ProxyAffinity | None = None
+
+
+def get_proxy_affinity() -> ProxyAffinity:
+    """Retorna a afinidade global de proxies por domínio"""
+    global _proxy_affinity
+
+    if _proxy_affinity is None:
+        _proxy_affinity = ProxyAffinity()
+
+    return _proxy_affinity
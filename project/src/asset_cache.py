@@ -0,0 +1,457 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import weakref
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from loguru import logger
+
+from .config import browser_settings
+from .metering import mark_local, mark_metered, meter_fetch
+
+INDEX_FILE = "index.json"
+
+# Cabeçalhos de transporte: o corpo obtido por `route.fetch` já vem
+# decodificado e o tamanho é recalculado ao servir
+TRANSPORT_HEADERS = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+    "connection",
+    "keep-alive",
+}
+
+# Cookies não devem vazar de um contexto para outro através do cache
+DROPPED_HEADERS = TRANSPORT_HEADERS | {"set-cookie"}
+
+# Cabeçalhos condicionais do próprio navegador: a revalidação é feita pelo cache
+CONDITIONAL_HEADERS = {
+    "if-none-match",
+    "if-modified-since",
+    "if-match",
+    "if-unmodified-since",
+    "if-range",
+}
+
+_DIRECTIVE_RE = re.compile(r"([a-z-]+)(?:=\"?([^\",]*)\"?)?")
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness(headers: dict, max_ttl: int) -> float | None:
+    """
+    Segundos de frescor de uma resposta segundo RFC 9111, limitados a
+    `max_ttl`. None se a resposta não pode ser guardada em um cache
+    compartilhado.
+    """
+    directives = dict(_DIRECTIVE_RE.findall(headers.get("cache-control", "").lower()))
+    if "no-store" in directives or "private" in directives:
+        return None
+
+    vary = {v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()}
+    if vary - {"accept-encoding"}:
+        return None
+
+    if "no-cache" in directives:
+        return 0
+
+    ttl = None
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name, "").isdigit():
+            ttl = int(directives[name])
+            break
+
+    date = _http_date(headers.get("date")) or time.time()
+    if ttl is None and (expires := _http_date(headers.get("expires"))):
+        ttl = expires - date
+    if ttl is None and (last_modified := _http_date(headers.get("last-modified"))):
+        # Frescor heurístico: 10% da idade do recurso
+        ttl = (date - last_modified) * 0.1
+
+    return max(0, min(ttl or 0, max_ttl))
+
+
+@dataclass
+class AssetCacheStats:
+    """Contadores do cache compartilhado de recursos"""
+
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+    bytes_saved: int = 0
+    network_bytes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        served = self.hits + self.revalidated
+        total = served + self.misses
+        return served / total if total else 0.0
+
+    def snapshot(self) -> dict:
+        return asdict(self) | {"hit_ratio": round(self.hit_ratio, 4)}
+
+
+class AssetCache:
+    """
+    Cache de recursos estáticos compartilhado entre contextos e engines.
+
+    As respostas são indexadas pela URL com seus validadores (ETag e
+    Last-Modified) e os corpos são guardados pelo seu hash, então o mesmo
+    bundle servido por URLs diferentes ocupa espaço uma única vez. Corpos
+    recentes ficam em um LRU em memória e todos ficam em disco, ambos
+    limitados em bytes. Respostas vencidas são revalidadas com pedidos
+    condicionais; um 304 é servido do cache.
+
+    Args:
+        directory: Diretório do cache. Se None, usa `BrowserSettings.asset_cache_dir`
+        max_memory_bytes: Limite do LRU em memória
+        max_disk_bytes: Limite dos corpos em disco
+        resource_types: Tipos de recurso do Playwright atendidos pelo cache
+        save_interval: Intervalo mínimo (s) entre gravações do índice
+    """
+
+    def __init__(
+        self,
+        directory=None,
+        max_memory_bytes: int | None = None,
+        max_disk_bytes: int | None = None,
+        resource_types=None,
+        save_interval=30.0,
+    ):
+        self.directory = Path(directory or browser_settings.asset_cache_dir)
+        self.max_memory_bytes = (
+            max_memory_bytes or browser_settings.asset_cache_memory_mb * 2**20
+        )
+        self.max_disk_bytes = (
+            max_disk_bytes or browser_settings.asset_cache_disk_mb * 2**20
+        )
+        self.resource_types = frozenset(
+            resource_types or browser_settings.asset_cache_resource_types
+        )
+        self.save_interval = save_interval
+        self.stats = AssetCacheStats()
+
+        self._index: OrderedDict[str, dict] = OrderedDict()
+        self._refs: Counter = Counter()
+        self._sizes: dict[str, int] = {}
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._save_task = None
+        self._load()
+
+    @property
+    def disk_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / digest
+
+    def _load(self):
+        try:
+            with open(self.directory / INDEX_FILE, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as err:
+            logger.warning(f"Erro ao carregar índice do cache de recursos: {err}")
+            return
+
+        for url, entry in sorted(entries.items(), key=lambda e: e[1]["last_used"]):
+            if self._object_path(entry["hash"]).exists():
+                self._add_entry(url, entry)
+
+    def _write(self, data: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / INDEX_FILE
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self):
+        """Grava o índice de forma atômica (ex: ao encerrar)"""
+        self._write(json.dumps(self._index))
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    async def _save_async(self, data: str):
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError as err:
+            logger.warning(f"Erro ao gravar índice do cache de recursos: {err}")
+
+    def maybe_save(self):
+        """Grava se houver mudanças e o intervalo mínimo tiver passado"""
+        if not self._dirty or time.monotonic() - self._last_save < self.save_interval:
+            return
+        if self._save_task is not None and not self._save_task.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            try:
+                self.save()
+            except OSError as err:
+                logger.warning(f"Erro ao gravar índice do cache de recursos: {err}")
+            return
+
+        # Serializa no loop (instantâneo consistente) e grava fora dele
+        data = json.dumps(self._index)
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._save_task = loop.create_task(self._save_async(data))
+
+    def _add_entry(self, url: str, entry: dict) -> str | None:
+        """Adiciona a entrada e retorna o hash do corpo anterior se ficou órfão"""
+        orphan = self._remove_entry(url)
+        self._index[url] = entry
+        self._refs[entry["hash"]] += 1
+        self._sizes[entry["hash"]] = entry["size"]
+        return orphan if orphan != entry["hash"] else None
+
+    def _remove_entry(self, url: str) -> str | None:
+        """Remove a entrada e retorna o hash do corpo se ele ficou órfão"""
+        entry = self._index.pop(url, None)
+        if entry is None:
+            return None
+
+        digest = entry["hash"]
+        self._refs[digest] -= 1
+        if self._refs[digest] > 0:
+            return None
+
+        del self._refs[digest]
+        self._sizes.pop(digest, None)
+        if body := self._memory.pop(digest, None):
+            self._memory_bytes -= len(body)
+        return digest
+
+    def _remember(self, digest: str, body: bytes):
+        if len(body) > self.max_memory_bytes:
+            return
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+
+        self._memory[digest] = body
+        self._memory_bytes += len(body)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _read_object(self, digest: str) -> bytes | None:
+        try:
+            return self._object_path(digest).read_bytes()
+        except OSError:
+            return None
+
+    def _write_object(self, digest: str, body: bytes):
+        path = self._object_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+
+    def _delete_objects(self, digests):
+        for digest in digests:
+            try:
+                self._object_path(digest).unlink()
+            except OSError:
+                pass
+
+    async def _body(self, url: str, entry: dict) -> bytes | None:
+        digest = entry["hash"]
+        if (body := self._memory.get(digest)) is None:
+            body = await asyncio.to_thread(self._read_object, digest)
+            if body is None:
+                # Corpo apagado por fora: descarta a entrada
+                self._remove_entry(url)
+                self._dirty = True
+                return None
+        self._remember(digest, body)
+        return body
+
+    async def _store(self, url: str, status: int, headers: dict, body: bytes, ttl):
+        digest = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        entry = {
+            "hash": digest,
+            "size": len(body),
+            "status": status,
+            "headers": {
+                k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS
+            },
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "expires_at": now + ttl,
+            "last_used": now,
+        }
+
+        try:
+            await asyncio.to_thread(self._write_object, digest, body)
+        except OSError as err:
+            logger.warning(f"Erro ao gravar recurso no cache: {err}")
+            return
+
+        orphans = [orphan] if (orphan := self._add_entry(url, entry)) else []
+        self._remember(digest, body)
+        self.stats.stored += 1
+
+        while self.disk_bytes > self.max_disk_bytes and len(self._index) > 1:
+            oldest = next(iter(self._index))
+            self.stats.evicted += 1
+            if orphan := self._remove_entry(oldest):
+                orphans.append(orphan)
+        if orphans:
+            await asyncio.to_thread(self._delete_objects, orphans)
+
+        self._dirty = True
+        self.maybe_save()
+
+    def _touch(self, url: str, entry: dict):
+        entry["last_used"] = time.time()
+        self._index.move_to_end(url)
+        self._dirty = True
+
+    async def _fulfill(self, route, entry: dict, body: bytes):
+        # Servido do cache (ou revalidado só com cabeçalhos): fora da medição
+        mark_local(route.request)
+        await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+
+    async def handle(self, route, context=None):
+        """
+        Handler de `route`: serve do cache, revalida ou busca e guarda. O
+        `context` dono da rota recebe na medição de tráfego o `route.fetch`.
+        """
+        request = route.request
+        if request.method != "GET" or request.resource_type not in self.resource_types:
+            await route.fallback()
+            return
+
+        url = request.url
+        entry = self._index.get(url)
+        body = await self._body(url, entry) if entry else None
+        if body is None:
+            entry = None
+
+        if entry and entry["expires_at"] > time.time():
+            self._touch(url, entry)
+            self.stats.hits += 1
+            self.stats.bytes_saved += len(body)
+            await self._fulfill(route, entry, body)
+            return
+
+        headers = {
+            k: v
+            for k, v in (await request.all_headers()).items()
+            if k.lower() not in CONDITIONAL_HEADERS
+        }
+        if entry and entry["etag"]:
+            headers["if-none-match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["if-modified-since"] = entry["last_modified"]
+
+        try:
+            response = await route.fetch(headers=headers)
+        except Exception as err:
+            logger.debug(f"Erro ao buscar recurso {url}: {err}")
+            await meter_fetch(context, url, request_headers=headers)
+            await route.fallback()
+            return
+
+        ttl = freshness(response.headers, browser_settings.asset_cache_max_ttl)
+
+        if entry and response.status == 304:
+            await meter_fetch(context, url, response, headers, body=b"")
+            mark_metered(route.request)
+            entry["expires_at"] = time.time() + (ttl or 0)
+            self._touch(url, entry)
+            self.stats.revalidated += 1
+            self.stats.bytes_saved += len(body)
+            await self._fulfill(route, entry, body)
+            return
+
+        body = await response.body()
+        await meter_fetch(context, url, response, headers, body=body)
+        self.stats.misses += 1
+        self.stats.network_bytes += len(body)
+
+        has_validators = (
+            "etag" in response.headers or "last-modified" in response.headers
+        )
+        if response.status == 200 and ttl is not None and (ttl or has_validators):
+            await self._store(url, response.status, response.headers, body, ttl)
+        elif entry and (orphan := self._remove_entry(url)):
+            self._dirty = True
+            await asyncio.to_thread(self._delete_objects, [orphan])
+
+        # Já contabilizado pelo `route.fetch` acima
+        mark_metered(route.request)
+        await route.fulfill(
+            status=response.status,
+            headers={
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() not in TRANSPORT_HEADERS
+            },
+            body=body,
+        )
+
+
+_asset_cache: AssetCache | None = None
+_asset_cache_contexts = weakref.WeakSet()
+
+
+def get_asset_cache() -> AssetCache:
+    """Retorna o cache global de recursos estáticos"""
+    global _asset_cache
+
+    if _asset_cache is None:
+        _asset_cache = AssetCache()
+
+    return _asset_cache
+
+
+async def install_asset_cache(context, cache: AssetCache = None):
+    """
+    Instala o cache de recursos no contexto (uma única vez por contexto).
+
+    Os handlers de rota do Playwright rodam na ordem inversa do registro, então
+    o cache deve ser instalado antes das políticas de bloqueio para que pedidos
+    bloqueados sejam abortados sem passar por ele.
+
+    Args:
+        context: Contexto do Playwright
+        cache: Cache a usar. Se None, usa `get_asset_cache()`
+    """
+    if context in _asset_cache_contexts:
+        return
+
+    if cache is None:
+        cache = get_asset_cache()
+
+    await context.route("**/*", lambda route: cache.handle(route, context))
+    _asset_cache_contexts.add(context)
@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.metadata import PackageNotFoundError, version
+
+from loguru import logger
+from playwright.async_api import async_playwright
+
+from .. import procfs
+from ..browser import (
+    LAUNCH_PROFILES,
+    measure_launch_profile,
+    navigate_with_retry,
+    set_browser,
+    set_context,
+    set_page,
+)
+from ..host_stats import percentile
+
+WAIT_STRATEGIES = ("commit", "domcontentloaded", "load", "networkidle")
+
+FIXTURE_HTML = b"""<!doctype html>
+<html lang="pt-BR">
+<head>
+  <meta charset="utf-8">
+  <title>Fixture</title>
+  <link rel="stylesheet" href="/static/style.css">
+  <script src="/static/app.js" defer></script>
+</head>
+<body>
+  <main>
+    <article><h1>Resultado</h1><p>Lorem ipsum dolor sit amet.</p></article>
+    <img src="/static/pixel.svg" alt="">
+  </main>
+</body>
+</html>
+"""
+
+FIXTURE_FILES = {
+    "/": ("text/html; charset=utf-8", FIXTURE_HTML),
+    "/static/style.css": ("text/css", b"body { font-family: sans-serif; }" * 200),
+    # Um pedido XHR tardio mantém a rede ocupada até depois do "load"
+    "/static/app.js": (
+        "application/javascript",
+        b"setTimeout(() => fetch('/api/data?delay=0.2'), 100);" + b"//" * 4000,
+    ),
+    "/static/pixel.svg": (
+        "image/svg+xml",
+        b'<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1"/>',
+    ),
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Servidor local determinístico: nenhuma medição depende da rede"""
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == "/api/data":
+            delay = float(query.removeprefix("delay=") or 0) if query else 0
+            time.sleep(min(delay, 5))
+            content_type, body = "application/json", b'{"ok": true}'
+        elif path in FIXTURE_FILES:
+            content_type, body = FIXTURE_FILES[path]
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    return {
+        "n": len(samples_ms),
+        "median_ms": round(statistics.median(samples_ms), 2),
+        "p95_ms": round(percentile(samples_ms, 95), 2),
+        "min_ms": round(min(samples_ms), 2),
+        "max_ms": round(max(samples_ms), 2),
+    }
+
+
+async def timed(coroutine) -> tuple[object, float]:
+    started = time.perf_counter()
+    result = await coroutine
+    return result, (time.perf_counter() - started) * 1000
+
+
+async def bench_contexts(browser, samples: int) -> dict:
+    # Aquecimento fora da medição: o primeiro contexto paga a geração do pool
+    # de fingerprints e a preparação do cache de recursos
+    await (await set_context(browser)).close()
+
+    create, close = [], []
+    for _ in range(samples):
+        context, elapsed = await timed(set_context(browser))
+        create.append(elapsed)
+        _, elapsed = await timed(context.close())
+        close.append(elapsed)
+    return {"create": summarize(create), "close": summarize(close)}
+
+
+async def bench_pages(browser, samples: int) -> dict:
+    context = await set_context(browser)
+    create, close = [], []
+    try:
+        for _ in range(samples):
+            page, elapsed = await timed(set_page(context))
+            create.append(elapsed)
+            _, elapsed = await timed(page.close())
+            close.append(elapsed)
+    finally:
+        await context.close()
+    return {"create": summarize(create), "close": summarize(close)}
+
+
+async def bench_navigation(browser, url: str, samples: int) -> dict:
+    context = await set_context(browser)
+    results = {}
+    try:
+        page = await set_page(context)
+        for strategy in WAIT_STRATEGIES:
+            latencies = []
+            for _ in range(samples):
+                await page.goto("about:blank")
+                _, elapsed = await timed(
+                    navigate_with_retry(
+                        page,
+                        url,
+                        timeouts=[15000],
+                        wait_time=0,
+                        strategy_priority=(strategy,) * 3,
+                        mode="retry",
+                        adaptive=False,
+                    )
+                )
+                latencies.append(elapsed)
+            results[strategy] = summarize(latencies)
+    finally:
+        await context.close()
+    return results
+
+
+async def bench_context_rss(browser, pids, url: str, contexts: int) -> dict | None:
+    """RSS da árvore do navegador à medida que contextos com uma página são abertos"""
+    if not pids:
+        return None
+
+    def tree_rss():
+        children = procfs.children_map()
+        return sum(procfs.tree_rss_bytes(pid, children) for pid in pids)
+
+    baseline = tree_rss()
+    opened, series = [], []
+    try:
+        for _ in range(contexts):
+            context = await set_context(browser)
+            opened.append(context)
+            page = await set_page(context)
+            await page.goto(url, wait_until="load")
+            series.append(tree_rss())
+    finally:
+        for context in opened:
+            await context.close()
+
+    return {
+        "baseline_rss_bytes": baseline,
+        "rss_bytes_by_open_contexts": series,
+        "rss_bytes_per_context": int((series[-1] - baseline) / len(series)),
+    }
+
+
+async def bench_engine(
+    playwright, engine: str, url: str, args, driver_pids: set[int] | None = None
+) -> dict:
+    before = procfs.descendants(os.getpid()) if procfs.available() else set()
+    browser = await set_browser(playwright, engine=engine, profile=args.profile)
+    pids = (
+        procfs.new_process_roots(before, procfs.descendants(os.getpid()), driver_pids)
+        if procfs.available()
+        else set()
+    )
+
+    try:
+        return {
+            "contexts": await bench_contexts(browser, args.samples),
+            "pages": await bench_pages(browser, args.samples),
+            "navigation": await bench_navigation(browser, url, args.samples),
+            "memory": await bench_context_rss(browser, pids, url, args.contexts),
+        }
+    finally:
+        await browser.close()
+
+
+def _package_version(name: str) -> str | None:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+async def run(args) -> dict:
+    """
+    Mede, contra um servidor HTTP local, o lançamento por engine e perfil, a
+    criação de contextos e páginas, a navegação por estratégia de espera e o
+    RSS por contexto aberto. As opções de `BrowserSettings` (bloqueios, cache
+    de recursos etc.) valem durante a medição.
+
+    Exemplo:
+        python -m src.benchmarks.browser_lifecycle --engines chromium --output bench.json
+    """
+    server = start_fixture_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    results = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "playwright": _package_version("playwright"),
+            "platform": platform.platform(),
+            "samples": args.samples,
+            "launch_profile": args.profile,
+        },
+        "launch": [],
+        "engines": {},
+    }
+
+    drivers = procfs.playwright_drivers() if procfs.available() else set()
+    try:
+        async with async_playwright() as playwright:
+            # Navegadores medidos são filhos diretos deste driver
+            driver_pids = (
+                (procfs.playwright_drivers() - drivers) or None
+                if procfs.available()
+                else None
+            )
+            for engine in args.engines:
+                for profile in args.launch_profiles:
+                    logger.info(f"Medindo lançamento de {engine} ({profile})")
+                    results["launch"].append(
+                        await measure_launch_profile(
+                            playwright,
+                            engine,
+                            profile,
+                            samples=args.launch_samples,
+                            driver_pids=driver_pids,
+                        )
+                    )
+
+                logger.info(f"Medindo ciclo de vida de {engine}")
+                results["engines"][engine] = await bench_engine(
+                    playwright, engine, url, args, driver_pids
+                )
+    finally:
+        server.shutdown()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark do ciclo de vida de navegadores, contextos e páginas"
+    )
+    parser.add_argument("--engines", nargs="+", default=["chromium", "firefox"])
+    parser.add_argument(
+        "--launch-profiles", nargs="+", default=list(LAUNCH_PROFILES), metavar="PROFILE"
+    )
+    parser.add_argument("--profile", default=None, help="Perfil dos demais testes")
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--launch-samples", type=int, default=3)
+    parser.add_argument("--contexts", type=int, default=5, help="Contextos para RSS")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        logger.info(f"Resultados salvos em {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
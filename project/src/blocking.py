@@ -0,0 +1,131 @@
+import re
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from .config import browser_settings
+from .metering import mark_local
+
+# Tamanho típico (bytes) de cada tipo de recurso, usado para estimar a economia
+# de banda dos pedidos abortados (o corpo de um pedido abortado nunca é baixado)
+TYPICAL_RESOURCE_BYTES = {
+    "image": 25_000,
+    "media": 250_000,
+    "font": 30_000,
+    "stylesheet": 15_000,
+    "script": 20_000,
+    "texttrack": 5_000,
+    "manifest": 2_000,
+}
+DEFAULT_RESOURCE_BYTES = 5_000
+
+
+@dataclass
+class BlockingStats:
+    """Contadores de pedidos bloqueados em uma página"""
+
+    blocked_requests: int = 0
+    estimated_bytes_saved: int = 0
+    by_resource_type: Counter = field(default_factory=Counter)
+
+    def record(self, resource_type: str):
+        self.blocked_requests += 1
+        self.estimated_bytes_saved += TYPICAL_RESOURCE_BYTES.get(
+            resource_type, DEFAULT_RESOURCE_BYTES
+        )
+        self.by_resource_type[resource_type] += 1
+
+
+class BlockingPolicy:
+    """
+    Política de bloqueio de pedidos por tipo de recurso e padrão de URL.
+
+    Args:
+        resource_types: Tipos de recurso do Playwright a abortar
+            (ex: "image", "font", "stylesheet", "media")
+        url_patterns: Expressões regulares testadas contra a URL do pedido
+    """
+
+    def __init__(self, resource_types=(), url_patterns=()):
+        self.resource_types = frozenset(resource_types)
+        self.url_patterns = tuple(url_patterns)
+        self._url_regex = (
+            re.compile("|".join(f"(?:{pattern})" for pattern in self.url_patterns))
+            if self.url_patterns
+            else None
+        )
+
+    @classmethod
+    def from_settings(cls, settings=browser_settings):
+        """Cria a política a partir do `BrowserSettings` (None se desativada)"""
+        if not settings.block_resources:
+            return None
+
+        return cls(
+            resource_types=settings.blocked_resource_types,
+            url_patterns=settings.blocked_url_patterns,
+        )
+
+    def should_block(self, request) -> bool:
+        if request.resource_type in self.resource_types:
+            return True
+
+        return bool(self._url_regex and self._url_regex.search(request.url))
+
+
+_page_stats = weakref.WeakKeyDictionary()
+_blocking_targets = weakref.WeakSet()
+
+
+def get_blocking_stats(page) -> BlockingStats:
+    """Retorna os contadores de bloqueio acumulados de uma página"""
+    if page not in _page_stats:
+        _page_stats[page] = BlockingStats()
+    return _page_stats[page]
+
+
+def has_blocking(target) -> bool:
+    """Indica se a página ou contexto já tem a política de bloqueio instalada"""
+    return target in _blocking_targets
+
+
+def _request_page(request):
+    try:
+        return request.frame.page
+    except Exception:
+        # Pedidos de service workers não pertencem a nenhuma página
+        return None
+
+
+async def install_blocking(target, policy: BlockingPolicy):
+    """
+    Instala a política de bloqueio em uma página ou contexto via `route`.
+
+    Pedidos que não são bloqueados seguem para os próximos handlers com
+    `route.fallback()`, permitindo combinar esta camada com outras rotas.
+
+    Args:
+        target: Página ou contexto do Playwright
+        policy: Política de bloqueio
+    """
+
+    async def handle_route(route):
+        request = route.request
+
+        if not policy.should_block(request):
+            await route.fallback()
+            return
+
+        if page := _request_page(request):
+            get_blocking_stats(page).record(request.resource_type)
+
+        mark_local(request)
+        try:
+            await route.abort("blockedbyclient")
+        except Exception as err:
+            logger.debug(f"Erro ao abortar pedido {request.url}: {err}")
+
+    await target.route("**/*", handle_route)
+    _blocking_targets.add(target)
@@ -0,0 +1,160 @@
+import weakref
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from .blocking import get_blocking_stats
+from .config import browser_settings
+from .metering import mark_local
+
+DEFAULT_BLOCKLIST_FILE = Path(__file__).parent / "data" / "third_party_domains.txt"
+
+# Chave que marca o fim de um domínio na trie (nenhum label DNS é vazio)
+_END = ""
+
+
+def _normalize(domain: str) -> str:
+    return domain.strip().lower().rstrip(".")
+
+
+class DomainBlocklist:
+    """
+    Lista de domínios bloqueados armazenada em uma trie de sufixos.
+
+    Cada domínio é inserido com os labels invertidos (`com -> hotjar -> static`),
+    então verificar um host custa O(número de labels) independentemente do
+    tamanho da lista. Um domínio bloqueia também todos os seus subdomínios.
+
+    Os acertos por domínio ficam em `hits`, para calibrar a lista.
+    """
+
+    def __init__(self, domains=()):
+        self._root: dict = {}
+        self.size = 0
+        self.hits: Counter = Counter()
+        self.update(domains)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, host: str) -> bool:
+        return self.match(host) is not None
+
+    def add(self, domain: str):
+        """Adiciona um domínio (e implicitamente seus subdomínios)"""
+        domain = _normalize(domain)
+        if not domain:
+            return
+
+        node = self._root
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+
+        if _END not in node:
+            node[_END] = domain
+            self.size += 1
+
+    def update(self, domains):
+        for domain in domains:
+            self.add(domain)
+
+    def match(self, host: str) -> str | None:
+        """Retorna o domínio da lista que cobre o host, ou None"""
+        node = self._root
+        for label in reversed(_normalize(host).split(".")):
+            node = node.get(label)
+            if node is None:
+                return None
+            if _END in node:
+                return node[_END]
+        return None
+
+    def top_hits(self, n: int = 20):
+        """Domínios mais bloqueados, no formato [(domínio, acertos), ...]"""
+        return self.hits.most_common(n)
+
+    @classmethod
+    def from_file(cls, path) -> "DomainBlocklist":
+        blocklist = cls()
+        blocklist.update_from_file(path)
+        return blocklist
+
+    def update_from_file(self, path):
+        """Carrega um arquivo com um domínio por linha (`#` inicia comentário)"""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if domain := line.split("#", 1)[0].strip():
+                    self.add(domain)
+
+
+_default_blocklist: DomainBlocklist | None = None
+
+
+def get_default_blocklist() -> DomainBlocklist:
+    """
+    Retorna a lista padrão: a lista embarcada mais os domínios extras do
+    `BrowserSettings` (`blocklist_file` e `blocklist_extra_domains`).
+    """
+    global _default_blocklist
+
+    if _default_blocklist is None:
+        blocklist = DomainBlocklist.from_file(DEFAULT_BLOCKLIST_FILE)
+        if browser_settings.blocklist_file:
+            blocklist.update_from_file(browser_settings.blocklist_file)
+        blocklist.update(browser_settings.blocklist_extra_domains)
+        logger.info(f"Lista de bloqueio carregada com {len(blocklist)} domínios")
+        _default_blocklist = blocklist
+
+    return _default_blocklist
+
+
+_blocklist_contexts = weakref.WeakSet()
+
+
+def _is_main_navigation(request) -> bool:
+    try:
+        return request.is_navigation_request() and request.frame.parent_frame is None
+    except Exception:
+        return False
+
+
+async def install_domain_blocklist(context, blocklist: DomainBlocklist = None):
+    """
+    Instala no contexto um único handler de rota que aborta pedidos para
+    domínios da lista. Navegações do frame principal nunca são bloqueadas.
+
+    Args:
+        context: Contexto do Playwright
+        blocklist: Lista de domínios. Se None, usa `get_default_blocklist()`.
+    """
+    if context in _blocklist_contexts:
+        return
+
+    if blocklist is None:
+        blocklist = get_default_blocklist()
+
+    async def handle_route(route):
+        request = route.request
+        host = urlsplit(request.url).hostname
+        domain = blocklist.match(host) if host else None
+
+        if domain is None or _is_main_navigation(request):
+            await route.fallback()
+            return
+
+        blocklist.hits[domain] += 1
+        try:
+            get_blocking_stats(request.frame.page).record(request.resource_type)
+        except Exception:
+            pass
+
+        mark_local(request)
+        try:
+            await route.abort("blockedbyclient")
+        except Exception as err:
+            logger.debug(f"Erro ao abortar pedido {request.url}: {err}")
+
+    await context.route("**/*", handle_route)
+    _blocklist_contexts.add(context)
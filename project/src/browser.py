@@ -1,119 +1,596 @@
 import asyncio
+import json
+import os
 import random
+import statistics
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from typing import Literal
 
-from fake_useragent import UserAgent
 from loguru import logger
+from playwright.async_api import Error as PlaywrightError
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
 
+from . import persistent_profiles, procfs
+from .asset_cache import AssetCache, install_asset_cache
+from .blocking import BlockingPolicy, has_blocking, install_blocking
+from .blocklist import DomainBlocklist, install_domain_blocklist
 from .config import browser_settings
-from .proxies import get_masked_proxy
+from .fingerprints import FingerprintProfile, get_fingerprint_pool, random_profile
+from .hedging import run_hedged
+from .host_stats import STAGED_KEY, get_host_stats, host_of
+from .leaks import get_leak_tracker, touch, track
+from .metering import install_metering
+from .proxies import get_masked_proxy, report_proxy_result
+from .storage_state import get_storage_states
+from .watchdog import BrowserWatchdog
 
-ua = UserAgent()
+# Proxy fictício de nível de navegador para engines que só aceitam proxy por
+# contexto quando o navegador foi lançado com algum proxy global
+PER_CONTEXT_PROXY_PLACEHOLDER = {"server": "http://per-context"}
+DIRECT_PROXY = {"server": "direct://"}
 
+_placeholder_browsers = weakref.WeakSet()
+
+# Emulate human-like behavior by intercepting WebDriver calls
+STEALTH_INIT_SCRIPT = """
+Object.defineProperty(navigator, 'webdriver', {
+    get: () => false
+});
+
+// Add plugins length
+Object.defineProperty(navigator, 'plugins', {
+    get: () => [1, 2, 3, 4, 5]
+});
+"""
+
+# Overwrite the languages property (contextos sem perfil de fingerprint)
+DEFAULT_LANGUAGES_INIT_SCRIPT = """
+Object.defineProperty(navigator, 'languages', {
+    get: () => ['pt-BR', 'pt']
+});
+"""
+
+_stealth_contexts = weakref.WeakSet()
+# Contextos persistentes, cujo cache HTTP as rotas padrão desligariam
+_persistent_contexts = weakref.WeakSet()
+
+# Proxy de cada contexto, para atribuir o resultado das navegações à sua saúde
+_context_proxies = weakref.WeakKeyDictionary()
+# Proxy de nível de navegador, herdado pelos contextos sem proxy próprio
+_browser_proxies = weakref.WeakKeyDictionary()
 
-async def set_chromium(playwright, headless=True, proxy=None):
-    browser_opts = dict(headless=headless)
 
+def _launch_proxy(engine, proxy, per_context_proxy):
     if proxy:
         logger.info(f"using proxy {get_masked_proxy(proxy)}")
-        browser_opts.update(dict(proxy=proxy))
+        return proxy
+
+    if per_context_proxy and engine in browser_settings.proxy_placeholder_engines:
+        return PER_CONTEXT_PROXY_PLACEHOLDER
+
+    return None
+
+
+# Perfis de lançamento por engine. "stealth" mantém o comportamento original;
+# "lean" desliga serviços de fundo que não importam para scraping;
+# "minimal-memory" troca desempenho de renderização por menos RSS.
+_STEALTH_CHROMIUM_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-features=IsolateOrigins,site-per-process",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+]
+_LEAN_CHROMIUM_ARGS = _STEALTH_CHROMIUM_ARGS + [
+    "--disable-gpu",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-domain-reliability",
+    "--disable-breakpad",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+    "--no-default-browser-check",
+]
+_STEALTH_FIREFOX_PREFS = {
+    "dom.webdriver.enabled": False,
+    "privacy.resistFingerprinting": False,
+    "browser.cache.disk.enable": True,
+    "browser.cache.memory.enable": True,
+}
+_LEAN_FIREFOX_PREFS = _STEALTH_FIREFOX_PREFS | {
+    "permissions.default.image": 2,
+    "browser.cache.memory.capacity": 16384,
+    "media.autoplay.default": 5,
+    "media.hardware-video-decoding.enabled": False,
+    "layers.acceleration.disabled": True,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "extensions.update.enabled": False,
+    "app.update.auto": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+}
 
-    return await playwright.chromium.launch(
-        args=[
-            "--disable-blink-features=AutomationControlled",
-            "--disable-features=IsolateOrigins,site-per-process",
-            "--disable-dev-shm-usage",
-            "--no-sandbox",
-            "--disable-setuid-sandbox",
-        ],
+LAUNCH_PROFILES = {
+    "stealth": {
+        "chromium": dict(args=_STEALTH_CHROMIUM_ARGS),
+        "firefox": dict(
+            args=["--disable-dev-shm-usage", "--no-sandbox"],
+            firefox_user_prefs=_STEALTH_FIREFOX_PREFS,
+        ),
+    },
+    "lean": {
+        "chromium": dict(args=_LEAN_CHROMIUM_ARGS),
+        "firefox": dict(
+            args=["--disable-dev-shm-usage", "--no-sandbox"],
+            firefox_user_prefs=_LEAN_FIREFOX_PREFS,
+        ),
+    },
+    "minimal-memory": {
+        "chromium": dict(
+            args=_LEAN_CHROMIUM_ARGS
+            + [
+                "--renderer-process-limit=2",
+                "--process-per-site",
+                "--disable-site-isolation-trials",
+                "--js-flags=--max-old-space-size=256",
+                "--disk-cache-size=1",
+                "--blink-settings=imagesEnabled=false",
+            ]
+        ),
+        "firefox": dict(
+            args=["--disable-dev-shm-usage", "--no-sandbox"],
+            firefox_user_prefs=_LEAN_FIREFOX_PREFS
+            | {
+                "browser.cache.memory.capacity": 4096,
+                "browser.cache.disk.enable": False,
+                "browser.sessionhistory.max_total_viewers": 0,
+                "dom.ipc.processCount": 1,
+                "fission.autostart": False,
+                "image.mem.max_decoded_image_kb": 8192,
+            },
+        ),
+    },
+}
+
+
+def launch_options(engine: str, profile: str | None = None) -> dict:
+    """Opções de `launch()` do perfil para a engine (cópia editável)"""
+    profile = profile or browser_settings.launch_profile
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(f"Launch profile {profile} not recognized.")
+
+    options = LAUNCH_PROFILES[profile][engine]
+    return {key: value.copy() for key, value in options.items()}
+
+
+async def set_chromium(
+    playwright, headless=True, proxy=None, per_context_proxy=False, profile=None
+):
+    browser_opts = dict(headless=headless)
+
+    if launch_proxy := _launch_proxy("chromium", proxy, per_context_proxy):
+        browser_opts.update(dict(proxy=launch_proxy))
+
+    browser = await playwright.chromium.launch(
+        **launch_options("chromium", profile),
         **browser_opts,
     )
 
+    if browser_opts.get("proxy") is PER_CONTEXT_PROXY_PLACEHOLDER:
+        _placeholder_browsers.add(browser)
+
+    return browser
+
 
-async def set_firefox(playwright, headless=True, proxy=None):
+async def set_firefox(
+    playwright, headless=True, proxy=None, per_context_proxy=False, profile=None
+):
     browser_opts = dict(headless=headless)
 
-    if proxy:
-        logger.info(f"using proxy {get_masked_proxy(proxy)}")
-        browser_opts.update(dict(proxy=proxy))
+    if launch_proxy := _launch_proxy("firefox", proxy, per_context_proxy):
+        browser_opts.update(dict(proxy=launch_proxy))
 
-    return await playwright.firefox.launch(
-        firefox_user_prefs={
-            "dom.webdriver.enabled": False,
-            "privacy.resistFingerprinting": False,
-            "browser.cache.disk.enable": True,
-            "browser.cache.memory.enable": True,
-        },
-        args=["--disable-dev-shm-usage", "--no-sandbox"],
+    browser = await playwright.firefox.launch(
+        **launch_options("firefox", profile),
         **browser_opts,
     )
 
+    if browser_opts.get("proxy") is PER_CONTEXT_PROXY_PLACEHOLDER:
+        _placeholder_browsers.add(browser)
+
+    return browser
+
+
+def select_engine(site: str, engines=("chromium", "firefox")) -> str:
+    """
+    Engine para o site segundo o desempenho medido (ver
+    `HostStatsStore.choose_engine`). Requer `BrowserSettings.engine_stats`
+    para acumular histórico; sem histórico a escolha é aleatória.
+    """
+    host = host_of(site) if "://" in site else site.lower()
+    return get_host_stats().choose_engine(host, engines)
+
+
+def server_endpoints(engine: str) -> list[str]:
+    """Endpoints da engine publicados pelo supervisor em `browser_servers_file`"""
+    try:
+        with open(browser_settings.browser_servers_file, "r", encoding="utf-8") as f:
+            return json.load(f).get("servers", {}).get(engine, [])
+    except (OSError, json.JSONDecodeError):
+        return []
+
+
+async def connect_browser(playwright, engine: str, ws_endpoint: str):
+    """Conecta a um servidor de navegador (ver `browser_server.py`)"""
+    browser = await getattr(playwright, engine).connect(
+        ws_endpoint, timeout=browser_settings.browser_server_connect_timeout_ms
+    )
+
+    # O supervisor lança essas engines com o proxy fictício
+    if engine in browser_settings.proxy_placeholder_engines:
+        _placeholder_browsers.add(browser)
+
+    return browser
+
 
 async def set_browser(
     playwright,
-    engine: Literal["firefox", "chromium", "random"],
+    engine: Literal["firefox", "chromium", "random", "auto"],
     headless: bool = True,
     proxy=None,
+    per_context_proxy: bool = False,
+    profile: str | None = None,
+    ws_endpoint: str | None = None,
+    site: str | None = None,
 ):
-    browser_opts = dict(headless=headless)
+    """
+    Lança um navegador da engine escolhida.
+
+    Com `ws_endpoint`, ou com `BrowserSettings.browser_servers` ativo e um
+    servidor publicado para a engine, conecta a um servidor compartilhado em
+    vez de lançar um processo próprio. Fechar o navegador conectado apenas
+    desconecta; o servidor continua de pé para os outros workers.
+
+    Args:
+        playwright: Instância do Playwright
+        engine: "firefox", "chromium", "random" ou "auto" (escolhida por
+            `select_engine` para `site`)
+        headless: Se o navegador deve rodar sem interface
+        proxy: Proxy global do navegador (todas as páginas usam o mesmo)
+        per_context_proxy: Se o navegador vai receber proxies por contexto via
+            `set_context(browser, proxy=...)`. Nesse caso `proxy` deve ser None.
+        profile: Perfil de `LAUNCH_PROFILES` ("stealth", "lean" ou
+            "minimal-memory"). Se None, usa `BrowserSettings.launch_profile`.
+            Ignorado ao conectar (vale o perfil do servidor)
+        ws_endpoint: Endpoint websocket de um servidor de navegador
+        site: URL ou host que o navegador vai visitar (usado por "auto")
+    """
+    browser_opts = dict(
+        headless=headless, per_context_proxy=per_context_proxy, profile=profile
+    )
 
     if proxy:
         browser_opts.update(dict(proxy=proxy))
 
-    if engine == "random":
+    if engine == "auto" and site:
+        engine = select_engine(site)
+    elif engine in ("random", "auto"):
         engine = random.choice(["chromium", "firefox"])
 
+    # Um servidor compartilhado não pode receber proxy de nível de navegador
+    if ws_endpoint is None and browser_settings.browser_servers and not proxy:
+        if endpoints := server_endpoints(engine):
+            ws_endpoint = random.choice(endpoints)
+        else:
+            logger.warning(f"Nenhum servidor de {engine} publicado; lançando local")
+
+    if ws_endpoint:
+        return track(await connect_browser(playwright, engine, ws_endpoint), "browser")
+
     match engine:
         case "firefox":
-            return await set_firefox(playwright, **browser_opts)
+            browser = await set_firefox(playwright, **browser_opts)
         case "chromium":
-            return await set_chromium(playwright, **browser_opts)
+            browser = await set_chromium(playwright, **browser_opts)
         case _:
             raise ValueError(f"Engine {engine} not recognized.")
 
+    if proxy:
+        _browser_proxies[browser] = proxy
+
+    return track(browser, "browser")
+
+
+async def measure_launch_profile(
+    playwright,
+    engine: str,
+    profile: str | None = None,
+    samples: int = 3,
+    driver_pids: set[int] | None = None,
+) -> dict:
+    """
+    Mede o custo de um perfil de lançamento: tempo de inicialização e RSS da
+    árvore de processos do navegador (via /proc) com uma página em branco.
+
+    Só os processos lançados pelo driver do Playwright (`driver_pids`; se
+    None, todos os drivers deste processo) são atribuídos ao navegador.
+
+    Returns:
+        dict: {"engine", "profile", "startup_s", "rss_bytes"} com as medianas
+    """
+    profile = profile or browser_settings.launch_profile
+    startups, rss = [], []
+    if driver_pids is None and procfs.available():
+        driver_pids = procfs.playwright_drivers() or None
+
+    for _ in range(samples):
+        before = procfs.descendants(os.getpid()) if procfs.available() else set()
+        started = time.perf_counter()
+        browser = await set_browser(playwright, engine=engine, profile=profile)
+        startups.append(time.perf_counter() - started)
+
+        try:
+            page = await browser.new_page()
+            await page.goto("about:blank")
+            if procfs.available():
+                after = procfs.descendants(os.getpid())
+                children = procfs.children_map()
+                rss.append(
+                    sum(
+                        procfs.tree_rss_bytes(pid, children)
+                        for pid in procfs.new_process_roots(before, after, driver_pids)
+                    )
+                )
+        finally:
+            await browser.close()
+
+    return {
+        "engine": engine,
+        "profile": profile,
+        "startup_s": round(statistics.median(startups), 3),
+        "rss_bytes": int(statistics.median(rss)) if rss else None,
+    }
+
+
+async def set_context(
+    browser,
+    proxy=None,
+    block_policy: BlockingPolicy = None,
+    blocklist: DomainBlocklist = None,
+    profile: FingerprintProfile = None,
+    asset_cache: AssetCache = None,
+    storage_state: dict | str | None = None,
+):
+    """
+    Cria um contexto com um perfil de fingerprint coerente.
+
+    Args:
+        browser: Navegador retornado por `set_browser`
+        proxy: Proxy exclusivo do contexto, permitindo que um único navegador
+            atenda vários proxies simultaneamente
+        block_policy: Política de bloqueio de recursos aplicada a todas as
+            páginas do contexto. Se None, usa `BrowserSettings.block_resources`.
+        blocklist: Lista de domínios de terceiros bloqueados no contexto. Se
+            None, usa a lista padrão quando `block_third_party_domains` está ativo.
+        profile: Perfil de fingerprint (user agent, plataforma, viewport,
+            locale, timezone e toque). Se None, sorteia um perfil compatível
+            com a engine do pool de `get_fingerprint_pool()`
+        asset_cache: Cache compartilhado de recursos estáticos. Se None, usa
+            `get_asset_cache()` quando `BrowserSettings.asset_cache` está ativo.
+        storage_state: Snapshot de cookies/localStorage (dicionário ou caminho
+            de arquivo) carregado no contexto, ver `StorageStateStore`
+    """
+    profile = profile or random_profile(browser.browser_type.name)
+    context_opts = profile.context_options()
+
+    if proxy:
+        logger.info(f"using context proxy {get_masked_proxy(proxy)}")
+        context_opts.update(dict(proxy=proxy))
+    elif browser in _placeholder_browsers:
+        # Evita que o contexto herde o proxy fictício do navegador
+        context_opts.update(dict(proxy=DIRECT_PROXY))
+
+    if storage_state:
+        context_opts.update(dict(storage_state=storage_state))
+
+    context = await browser.new_context(permissions=["geolocation"], **context_opts)
+    if proxy := proxy or _browser_proxies.get(browser):
+        _context_proxies[context] = proxy
+    install_metering(context, proxy)
+
+    await _setup_context(context, profile, block_policy, blocklist, asset_cache)
+
+    return track(context, "context")
+
+
+async def _setup_context(
+    context,
+    profile,
+    block_policy=None,
+    blocklist=None,
+    asset_cache=None,
+    use_settings: bool = True,
+):
+    # Registrado uma única vez por contexto: vale para todas as páginas abertas
+    await context.add_init_script(STEALTH_INIT_SCRIPT + profile.init_script())
+    _stealth_contexts.add(context)
+
+    # Sem `use_settings` só as rotas pedidas explicitamente são instaladas
+    if use_settings:
+        block_policy = block_policy or BlockingPolicy.from_settings()
+
+    # Instalado antes dos bloqueios: as rotas rodam na ordem inversa do registro
+    if asset_cache is not None or (use_settings and browser_settings.asset_cache):
+        await install_asset_cache(context, asset_cache)
+
+    if block_policy:
+        await install_blocking(context, block_policy)
+
+    if blocklist is not None or (
+        use_settings and browser_settings.block_third_party_domains
+    ):
+        await install_domain_blocklist(context, blocklist)
+
+
+async def set_persistent_context(
+    playwright,
+    engine: Literal["firefox", "chromium"],
+    slot: int = 0,
+    headless: bool = True,
+    proxy=None,
+    profile: str | None = None,
+    block_policy: BlockingPolicy = None,
+    blocklist: DomainBlocklist = None,
+):
+    """
+    Lança um contexto persistente com um diretório de perfil por engine e
+    slot de worker, preservando o cache HTTP em disco entre execuções.
+
+    O cache é limitado a `BrowserSettings.persistent_cache_max_mb` tanto pelas
+    opções da engine quanto por uma poda antes do lançamento. O perfil de
+    fingerprint do slot é fixo, para que cookies e cache continuem coerentes.
+
+    Qualquer handler de `route` desliga o cache HTTP do navegador, que é a
+    razão de ser do perfil persistente. Por isso o cache de recursos e os
+    bloqueios das `BrowserSettings` não são instalados aqui; `block_policy` e
+    `blocklist` explícitos são instalados, ao custo do cache HTTP.
+
+    Args:
+        playwright: Instância do Playwright
+        engine: "firefox" ou "chromium"
+        slot: Índice do worker dono do diretório (um processo por diretório)
+        headless: Se o navegador deve rodar sem interface
+        proxy: Proxy do contexto (fixo durante toda a vida do contexto)
+        profile: Perfil de lançamento (ver `LAUNCH_PROFILES`)
+        block_policy: Política de bloqueio de recursos (desliga o cache HTTP)
+        blocklist: Lista de domínios de terceiros bloqueados (desliga o cache HTTP)
+    """
+    user_data_dir = persistent_profiles.profile_dir(engine, slot)
+    user_data_dir.mkdir(parents=True, exist_ok=True)
+
+    max_bytes = browser_settings.persistent_cache_max_mb * 2**20
+    persistent_profiles.prune_cache(user_data_dir, max_bytes)
 
-async def set_context(browser):
-    # Create a new browser context with random viewport size
-    viewport_width = random.randint(*browser_settings.viewport_width_range)
-    viewport_height = random.randint(*browser_settings.viewport_height_range)
+    fingerprint = None
+    if profile_id := persistent_profiles.load_slot_fingerprint(user_data_dir):
+        fingerprint = get_fingerprint_pool().get(profile_id)
+    if fingerprint is None:
+        fingerprint = random_profile(engine)
+        persistent_profiles.save_slot_fingerprint(user_data_dir, fingerprint.id)
 
-    return await browser.new_context(
-        user_agent=ua.random,
-        viewport={"width": viewport_width, "height": viewport_height},
-        locale=random.choice(browser_settings.locales),
-        timezone_id=random.choice(browser_settings.timezones),
+    options = launch_options(engine, profile)
+    cache_options = persistent_profiles.cache_size_options(engine, max_bytes)
+    if "args" in cache_options:
+        options["args"] = options.get("args", []) + cache_options["args"]
+    if "firefox_user_prefs" in cache_options:
+        options["firefox_user_prefs"] = (
+            options.get("firefox_user_prefs", {}) | cache_options["firefox_user_prefs"]
+        )
+
+    if proxy:
+        logger.info(f"using proxy {get_masked_proxy(proxy)}")
+        options.update(dict(proxy=proxy))
+
+    context = await getattr(playwright, engine).launch_persistent_context(
+        str(user_data_dir),
+        headless=headless,
         permissions=["geolocation"],
-        has_touch=random.choice([True, False]),
+        **options,
+        **fingerprint.context_options(),
     )
+    install_metering(context, proxy)
+    _persistent_contexts.add(context)
+
+    await _setup_context(
+        context, fingerprint, block_policy, blocklist, use_settings=False
+    )
+
+    return track(context, "context")
+
+
+async def set_page(context, block_policy: BlockingPolicy = None):
+    """
+    Abre uma página no contexto com os scripts anti-detecção.
 
+    Em contextos criados por `set_context` os scripts e rotas já estão
+    registrados no contexto, então abrir uma página não exige nenhuma
+    configuração adicional.
 
-async def set_page(context):
+    Args:
+        context: Contexto retornado por `set_context`
+        block_policy: Política de bloqueio de recursos da página. Se None e o
+            contexto ainda não bloqueia recursos, usa `BrowserSettings`, exceto
+            em contextos persistentes, que preservam o cache HTTP.
+            Os contadores ficam disponíveis em `get_blocking_stats(page)`.
+    """
     page = await context.new_page()
 
-    # Emulate human-like behavior by intercepting WebDriver calls
-    await page.add_init_script(
-        """
-    Object.defineProperty(navigator, 'webdriver', {
-        get: () => false
-    });
+    if (
+        block_policy is None
+        and not has_blocking(context)
+        and context not in _persistent_contexts
+    ):
+        block_policy = BlockingPolicy.from_settings()
 
-    // Add plugins length
-    Object.defineProperty(navigator, 'plugins', {
-        get: () => [1, 2, 3, 4, 5]
-    });
+    if block_policy:
+        await install_blocking(page, block_policy)
 
-    // Overwrite the languages property
-    Object.defineProperty(navigator, 'languages', {
-        get: () => ['pt-BR', 'pt']
-    });
+    if context not in _stealth_contexts:
+        # Contextos criados fora de `set_context` recebem o script por página
+        await page.add_init_script(STEALTH_INIT_SCRIPT + DEFAULT_LANGUAGES_INIT_SCRIPT)
+
+    return track(page, "page")
+
+
+@dataclass(frozen=True)
+class HumanizationPolicy:
     """
-    )
+    Política de humanização de `do_movements`.
+
+    Modos:
+        "off": nenhum movimento
+        "budgeted": movimentos limitados a `budget_ms` milissegundos
+        "full": sequência completa de scroll e movimentos do mouse
+    """
+
+    mode: Literal["off", "budgeted", "full"] = "full"
+    budget_ms: int = 1000
+
+    @classmethod
+    def off(cls):
+        return cls(mode="off")
 
-    return page
+    @classmethod
+    def budgeted(cls, budget_ms: int):
+        return cls(mode="budgeted", budget_ms=budget_ms)
+
+    @classmethod
+    def full(cls):
+        return cls(mode="full")
+
+    @classmethod
+    def from_settings(cls, settings=browser_settings):
+        return cls(
+            mode=settings.humanization_mode,
+            budget_ms=settings.humanization_budget_ms,
+        )
 
 
-async def do_movements(page):
+async def _move_randomly(page):
     # Random scrolling behavior
     for _ in range(random.randint(*browser_settings.mouse_scroll_moves_range)):
         await page.mouse.wheel(
@@ -133,40 +610,293 @@ async def do_movements(page):
         await asyncio.sleep(random.uniform(0.05, 0.1))
 
 
+async def _run_movements(page, policy: HumanizationPolicy):
+    try:
+        if policy.mode == "budgeted":
+            await asyncio.wait_for(_move_randomly(page), policy.budget_ms / 1000)
+        else:
+            await _move_randomly(page)
+    except asyncio.TimeoutError:
+        pass
+    except PlaywrightError as err:
+        logger.debug(f"Movimentos interrompidos: {err}")
+
+
+async def do_movements(page, policy: HumanizationPolicy = None, until=None):
+    """
+    Simula scroll e movimentos do mouse segundo a política de humanização.
+
+    Com `until`, os movimentos rodam em paralelo à condição do chamador (ex:
+    `page.wait_for_event("response", ...)` ou `page.wait_for_selector(...)`) e são
+    interrompidos assim que ela termina, sem entrar no caminho crítico.
+
+    Args:
+        page: Instância da página do Playwright
+        policy: Política de humanização. Se None, usa `BrowserSettings`
+        until: Awaitable cuja conclusão encerra os movimentos
+
+    Returns:
+        Resultado de `until`, ou None se não foi informado
+    """
+    policy = policy or HumanizationPolicy.from_settings()
+
+    movements = None
+    if policy.mode != "off":
+        movements = asyncio.create_task(_run_movements(page, policy))
+
+    try:
+        if until is not None:
+            return await until
+        if movements is not None:
+            await movements
+        return None
+    finally:
+        if movements is not None and not movements.done():
+            movements.cancel()
+            await asyncio.gather(movements, return_exceptions=True)
+
+
+DOM_STABLE_SCRIPT = """
+({ quietMs, timeoutMs, selector }) => new Promise((resolve) => {
+    const found = () => selector && document.querySelector(selector);
+    if (found()) {
+        resolve("selector");
+        return;
+    }
+
+    let quietTimer = null;
+    let deadlineTimer = null;
+    let observer = null;
+
+    const done = (reason) => {
+        if (observer) observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(deadlineTimer);
+        resolve(reason);
+    };
+
+    observer = new MutationObserver(() => {
+        if (found()) {
+            done("selector");
+            return;
+        }
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done("quiet"), quietMs);
+    });
+
+    observer.observe(document.documentElement || document, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        characterData: true,
+    });
+    quietTimer = setTimeout(() => done("quiet"), quietMs);
+    deadlineTimer = setTimeout(() => done("timeout"), timeoutMs);
+})
+"""
+
+
+async def wait_for_dom_stable(
+    page,
+    quiet_ms: int | None = None,
+    timeout: int | None = None,
+    selector: str | None = None,
+) -> Literal["selector", "quiet", "timeout"]:
+    """
+    Aguarda o DOM ficar estável usando um MutationObserver injetado na página.
+
+    Resolve quando o DOM fica `quiet_ms` sem mutações ou quando `selector`
+    aparece, o que for primeiro. Útil para SPAs cujo long-polling e analytics
+    impedem o `networkidle`.
+
+    Args:
+        page: Instância da página do Playwright
+        quiet_ms: Janela sem mutações (ms). Se None, usa
+            `BrowserSettings.dom_quiet_ms`
+        timeout: Tempo máximo de espera (ms). Se None, usa
+            `BrowserSettings.dom_stable_timeout_ms`
+        selector: Seletor CSS que encerra a espera assim que existir
+
+    Returns:
+        str: "selector", "quiet" ou "timeout"
+    """
+    quiet_ms = quiet_ms or browser_settings.dom_quiet_ms
+    timeout = timeout or browser_settings.dom_stable_timeout_ms
+    started = time.monotonic()
+
+    while (remaining := timeout - (time.monotonic() - started) * 1000) > 0:
+        try:
+            return await page.evaluate(
+                DOM_STABLE_SCRIPT,
+                {"quietMs": quiet_ms, "timeoutMs": remaining, "selector": selector},
+            )
+        except PlaywrightError as err:
+            # Uma navegação no meio da espera destrói o contexto de execução
+            if "Execution context was destroyed" not in str(err):
+                raise
+            try:
+                await page.wait_for_load_state(
+                    "domcontentloaded", timeout=max(1, remaining)
+                )
+            except PlaywrightTimeoutError:
+                return "timeout"
+
+    return "timeout"
+
+
+# Trechos de mensagens de erro que indicam falha de rede (e não timeout)
+NETWORK_ERROR_MARKERS = ("net::ERR_", "NS_ERROR_", "SSL_ERROR_")
+ABORTED_ERROR_MARKERS = ("net::ERR_ABORTED", "NS_BINDING_ABORTED")
+
+
+def is_network_error(err: Exception) -> bool:
+    """Indica se o erro do Playwright foi uma falha real de rede"""
+    message = str(err)
+    if any(marker in message for marker in ABORTED_ERROR_MARKERS):
+        return False
+    return any(marker in message for marker in NETWORK_ERROR_MARKERS)
+
+
 async def navigate_with_retry(
     page,
     url,
     timeouts: int = [30000, 60000, 90000],
     wait_time: int = 3,
     strategy_priority=("networkidle", "domcontentloaded", "load"),
+    mode: Literal["retry", "staged"] | None = None,
+    deadline: int | None = None,
+    ready_selector: str | None = None,
+    adaptive: bool | None = None,
 ):
     """
     Navega para uma URL com mecanismo de retry progressivo.
 
-    Estratégia:
+    Modo "retry":
     1. Tenta 3 vezes com "networkidle" com timeouts crescentes: 10s, 30s, 90s
     2. Se todas falharem, tenta com "domcontentloaded" (90s timeout)
     3. Se falhar, tenta com "load" (90s timeout)
 
+    Modo "staged":
+    1. Navega uma única vez até o commit da resposta
+    2. Aguarda em etapas (`navigation_commit_strategy` e depois
+       `navigation_idle_stages`: "load", "networkidle" ou "domstable")
+       enquanto houver prazo
+    3. Ao fim do prazo, retorna com o DOM que existir
+    A navegação só é repetida em falhas reais de rede.
+
     Args:
         page: Instância da página do Playwright
         url: URL de destino
+        mode: "retry" ou "staged". Se None, usa `BrowserSettings.navigation_mode`
+        deadline: Prazo total (ms) do modo "staged". Se None, usa
+            `BrowserSettings.navigation_deadline_ms`
+        ready_selector: Seletor que encerra a etapa "domstable" do modo
+            "staged" assim que aparece (ver `wait_for_dom_stable`)
+        adaptive: Se deve usar o histórico do host (`HostStatsStore`) para
+            escolher a estratégia inicial e o timeout a partir do p95. Se None,
+            usa `BrowserSettings.adaptive_navigation`
+
+    Com `BrowserSettings.engine_stats` o resultado e a latência total são
+    registrados por host e engine, alimentando `select_engine`. Se o contexto
+    usa um proxy, o resultado também alimenta a saúde do proxy (ver
+    `ProxyPool`) com a latência do `goto` bem-sucedido, sem esperas nem
+    tentativas anteriores; só timeouts e falhas de rede contam contra ele.
 
     Returns:
-        None
+        str: Estratégia/etapa de carregamento alcançada
 
     Raises:
         PlaywrightTimeoutError: Se todas as tentativas falharem
     """
+    mode = mode or browser_settings.navigation_mode
+    adaptive = browser_settings.adaptive_navigation if adaptive is None else adaptive
+
+    host = host_of(url)
+    touch(page, page.context)
+    stats = get_host_stats() if adaptive else None
+
+    def record(strategy, latency_ms, success):
+        if stats is not None:
+            stats.record(host, strategy, latency_ms, success)
 
+    async def navigate():
+        nonlocal strategy_priority, timeouts, deadline
+
+        match mode:
+            case "retry":
+                if stats is not None:
+                    strategy_priority, timeouts = stats.recommend(
+                        host, strategy_priority, timeouts
+                    )
+                return await _navigate_retry(
+                    page, url, timeouts, wait_time, strategy_priority, record
+                )
+            case "staged":
+                deadline = deadline or browser_settings.navigation_deadline_ms
+                if stats is not None:
+                    deadline = (
+                        stats.adaptive_timeout(host, STAGED_KEY, deadline) or deadline
+                    )
+                return await _navigate_staged(
+                    page, url, deadline, ready_selector=ready_selector, record=record
+                )
+            case _:
+                raise ValueError(f"Navigation mode {mode} not recognized.")
+
+    proxy = _context_proxies.get(page.context)
+    if not browser_settings.engine_stats and not proxy:
+        reached, _ = await navigate()
+        return reached
+
+    started = time.monotonic()
+    try:
+        reached, goto_ms = await navigate()
+    except PlaywrightError as err:
+        latency_ms = (time.monotonic() - started) * 1000
+        if browser_settings.engine_stats:
+            _record_engine(page, host, latency_ms, False)
+        if isinstance(err, PlaywrightTimeoutError) or is_network_error(err):
+            report_proxy_result(proxy, False)
+        raise
+
+    latency_ms = (time.monotonic() - started) * 1000
+    if browser_settings.engine_stats:
+        _record_engine(page, host, latency_ms, True)
+    report_proxy_result(proxy, True, goto_ms)
+    return reached
+
+
+def _record_engine(page, host, latency_ms, success):
+    # Contextos persistentes não expõem o navegador (nem a engine)
+    if browser := page.context.browser:
+        get_host_stats().record_engine(
+            host, browser.browser_type.name, latency_ms, success
+        )
+
+
+async def _goto(page, url, strategy, timeout, record) -> float:
+    """Navega com `strategy` e retorna a latência (ms) do `goto`"""
+    started = time.monotonic()
+    try:
+        await page.goto(url, wait_until=strategy, timeout=timeout)
+    except PlaywrightTimeoutError:
+        record(strategy, (time.monotonic() - started) * 1000, False)
+        raise
+    latency_ms = (time.monotonic() - started) * 1000
+    record(strategy, latency_ms, True)
+    return latency_ms
+
+
+async def _navigate_retry(page, url, timeouts, wait_time, strategy_priority, record):
     for attempt, timeout in enumerate(timeouts, 1):
         await asyncio.sleep(wait_time)
         try:
             logger.info(
-                f"Tentativa {attempt}/3 com '{strategy_priority[0]}' (timeout: {timeout}ms)"
+                f"Tentativa {attempt}/{len(timeouts)} com '{strategy_priority[0]}' "
+                f"(timeout: {timeout}ms)"
             )
-            await page.goto(url, wait_until=strategy_priority[0], timeout=timeout)
-            return  # Sucesso, sai da função
+            latency_ms = await _goto(page, url, strategy_priority[0], timeout, record)
+            return strategy_priority[0], latency_ms  # Sucesso, sai da função
         except PlaywrightTimeoutError:
             logger.error(f"Timeout na tentativa {attempt} com '{strategy_priority[0]}'")
             if attempt == len(timeouts):
@@ -174,26 +904,800 @@ async def navigate_with_retry(
                     f"Todas as tentativas com '{strategy_priority[0]}' falharam"
                 )
 
-    # Se chegou aqui, todas as tentativas com networkidle falharam
-    # Tenta com domcontentloaded
+    # Se chegou aqui, todas as tentativas com a primeira estratégia falharam
+    # Tenta com a segunda (por padrão, domcontentloaded)
     try:
         logger.info(
             f"Tentando com '{strategy_priority[1]}' (timeout: {timeouts[-1]}ms)"
         )
-        await page.goto(url, wait_until=strategy_priority[1], timeout=timeouts[-1])
-        return  # Sucesso, sai da função
+        latency_ms = await _goto(page, url, strategy_priority[1], timeouts[-1], record)
+        return strategy_priority[1], latency_ms  # Sucesso, sai da função
     except PlaywrightTimeoutError:
         logger.error(f"Timeout com '{strategy_priority[1]}'")
 
-    # Última tentativa com load
+    # Última tentativa (por padrão, load)
     try:
         logger.info(
             f"Tentando com '{strategy_priority[2]}' (timeout: {timeouts[-1]}ms)"
         )
-        await page.goto(url, wait_until=f"{strategy_priority[2]}", timeout=timeouts[-1])
-        return  # Sucesso, sai da função
+        latency_ms = await _goto(page, url, strategy_priority[2], timeouts[-1], record)
+        return strategy_priority[2], latency_ms  # Sucesso, sai da função
     except PlaywrightTimeoutError:
         logger.error(
             f"Timeout com '{strategy_priority[2]}' - todas as estratégias falharam"
         )
         raise  # Re-lança a exceção
+
+
+async def _navigate_staged(page, url, deadline, ready_selector=None, record=None):
+    # O `goto` só espera o commit; "domcontentloaded" em diante é etapa opcional,
+    # para que um prazo esgotado ainda devolva o DOM parcial
+    stages = list(browser_settings.navigation_idle_stages)
+    if browser_settings.navigation_commit_strategy != "commit":
+        stages.insert(0, browser_settings.navigation_commit_strategy)
+    started = time.monotonic()
+
+    def elapsed():
+        return (time.monotonic() - started) * 1000
+
+    def remaining():
+        # O Playwright interpreta timeout=0 como "sem limite"
+        return max(1, deadline - elapsed())
+
+    for attempt in range(1, browser_settings.navigation_network_retries + 2):
+        try:
+            logger.info(f"Navegando com 'commit' (prazo: {remaining():.0f}ms)")
+            goto_started = time.monotonic()
+            await page.goto(url, wait_until="commit", timeout=remaining())
+            commit_ms = (time.monotonic() - goto_started) * 1000
+            break
+        except PlaywrightTimeoutError:
+            logger.error(f"Prazo de {deadline}ms esgotado antes do commit")
+            if record:
+                record(STAGED_KEY, elapsed(), False)
+            raise
+        except PlaywrightError as err:
+            if (
+                not is_network_error(err)
+                or attempt > browser_settings.navigation_network_retries
+                or remaining() <= 1
+            ):
+                raise
+            logger.warning(f"Erro de rede na tentativa {attempt}: {err}")
+
+    reached = "commit"
+    for stage in stages:
+        if stage == "domstable":
+            result = await wait_for_dom_stable(
+                page, timeout=remaining(), selector=ready_selector
+            )
+            if result != "timeout":
+                reached = stage
+            # DOM estável (ou seletor presente): as demais etapas são dispensáveis
+            break
+
+        try:
+            await page.wait_for_load_state(stage, timeout=remaining())
+            reached = stage
+        except PlaywrightTimeoutError:
+            logger.info(f"Prazo esgotado aguardando '{stage}', usando o DOM disponível")
+            break
+
+    if record:
+        # Só conta como sucesso se a última etapa foi alcançada dentro do prazo
+        final_stage = (stages or ["commit"])[-1]
+        record(STAGED_KEY, elapsed(), reached in (final_stage, "domstable"))
+
+    return reached, commit_ms
+
+
+@dataclass
+class _PooledBrowser:
+    """Navegador mantido pelo pool e seus contadores de uso"""
+
+    engine: str
+    browser: object
+    active: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    # Modo persistente: o contexto é o próprio "navegador" do slot
+    context: object = None
+    slot: int | None = None
+    slot_lock: object = None
+    closed: bool = False
+    # Watchdog de memória: raízes da árvore de processos e contadores
+    pids: frozenset = frozenset()
+    navigations: int = 0
+    rss_bytes: int = 0
+    peak_rss_bytes: int = 0
+    launched_at: float = field(default_factory=time.monotonic)
+    retiring_since: float | None = None
+
+    def is_connected(self) -> bool:
+        if self.context is not None:
+            return not self.closed
+        return self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Pool de navegadores de longa duração.
+
+    Mantém um único driver do Playwright e navegadores aquecidos por engine,
+    entregando contextos novos através de `pool.context(...)`. O proxy é
+    configurado por contexto, então um mesmo navegador atende vários proxies
+    ao mesmo tempo. Navegadores ociosos por mais de `idle_timeout` segundos são
+    fechados, preservando `min_size` navegadores por engine.
+
+    Com `persistent` cada navegador é um contexto persistente com diretório de
+    perfil próprio (ver `set_persistent_context`), atendendo um consumidor por
+    vez. O cache HTTP sobrevive entre páginas e execuções, mas o proxy fica
+    fixo no lançamento, então proxies por contexto não são aceitos.
+
+    Com `watchdog` o RSS de cada navegador é amostrado via /proc; ao passar do
+    teto de memória ou do limite de navegações ele deixa de receber contextos,
+    espera os contextos em uso terminarem (até `drain_timeout`) e é fechado,
+    sendo substituído sob demanda. Ver `memory_stats()`.
+
+    Exemplo:
+        async with BrowserPool(engines=("firefox",)) as pool:
+            async with pool.context("firefox", proxy=proxy_config) as context:
+                page = await set_page(context)
+                await navigate_with_retry(page, url)
+    """
+
+    def __init__(
+        self,
+        engines=("firefox", "chromium"),
+        min_size: int | None = None,
+        max_size: int | None = None,
+        max_contexts_per_browser: int | None = None,
+        idle_timeout: float | None = None,
+        headless: bool = True,
+        profile: str | None = None,
+        persistent: bool | None = None,
+        watchdog: BrowserWatchdog | bool | None = None,
+    ):
+        self.engines = tuple(engines)
+        self.min_size = browser_settings.pool_min_size if min_size is None else min_size
+        self.max_size = browser_settings.pool_max_size if max_size is None else max_size
+        self.max_contexts_per_browser = (
+            browser_settings.pool_max_contexts_per_browser
+            if max_contexts_per_browser is None
+            else max_contexts_per_browser
+        )
+        self.idle_timeout = (
+            browser_settings.pool_idle_timeout if idle_timeout is None else idle_timeout
+        )
+        self.headless = headless
+        self.profile = profile
+        self.persistent = (
+            browser_settings.persistent_profiles if persistent is None else persistent
+        )
+        if self.persistent:
+            self.max_contexts_per_browser = 1
+
+        if watchdog is None:
+            watchdog = browser_settings.browser_watchdog
+        if watchdog is True:
+            watchdog = BrowserWatchdog()
+        self.watchdog = watchdog or None
+
+        if self.min_size > self.max_size:
+            raise ValueError("min_size não pode ser maior que max_size")
+
+        self._playwright = None
+        self._driver_pids: set[int] = set()
+        self._browsers: list[_PooledBrowser] = []
+        self._launching: dict[str, int] = {engine: 0 for engine in self.engines}
+        self._condition = asyncio.Condition()
+        self._start_lock = asyncio.Lock()
+        self._parked: OrderedDict = OrderedDict()
+        self._slots: dict[str, set] = {engine: set() for engine in self.engines}
+        self._launch_lock = asyncio.Lock()
+        self._tracked_contexts = weakref.WeakSet()
+        self._reaper_task = None
+        self._watchdog_task = None
+        self.closed = False
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def started(self):
+        return self._playwright is not None
+
+    async def start(self):
+        """Inicia o driver do Playwright e aquece `min_size` navegadores"""
+        async with self._start_lock:
+            if self.closed:
+                raise RuntimeError("BrowserPool já foi fechado")
+            if self.started:
+                return self
+
+            drivers = procfs.playwright_drivers() if procfs.available() else set()
+            self._playwright = await async_playwright().start()
+            if procfs.available():
+                # Os navegadores do pool são filhos diretos do seu driver
+                self._driver_pids = procfs.playwright_drivers() - drivers
+
+            await asyncio.gather(
+                *[
+                    self._warm_up(engine)
+                    for engine in self.engines
+                    for _ in range(self.min_size)
+                ]
+            )
+
+            self._reaper_task = asyncio.create_task(self._reap_idle())
+            if self.watchdog:
+                self._watchdog_task = asyncio.create_task(self._watch_memory())
+            logger.info(f"BrowserPool iniciado com {len(self._browsers)} navegador(es)")
+            return self
+
+    async def close(self):
+        """Fecha todos os navegadores e encerra o driver do Playwright"""
+        self.closed = True
+
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+
+        if self._watchdog_task:
+            self._watchdog_task.cancel()
+            self._watchdog_task = None
+
+        async with self._condition:
+            browsers, self._browsers = self._browsers, []
+            self._parked.clear()
+            self._condition.notify_all()
+
+        for pooled in browsers:
+            await self._close_browser(pooled)
+
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def stats(self):
+        """Retorna a quantidade de navegadores e contextos ativos por engine"""
+        return {
+            engine: {
+                "browsers": sum(1 for b in self._browsers if b.engine == engine),
+                "active_contexts": sum(
+                    b.active for b in self._browsers if b.engine == engine
+                ),
+                "cached_contexts": sum(1 for key in self._parked if key[0] == engine),
+            }
+            for engine in self.engines
+        }
+
+    def memory_stats(self) -> dict:
+        """RSS atual e de pico por navegador e eventos de reciclagem"""
+        return {
+            "browsers": [
+                {
+                    "engine": b.engine,
+                    "rss_bytes": b.rss_bytes,
+                    "peak_rss_bytes": b.peak_rss_bytes,
+                    "navigations": b.navigations,
+                    "active_contexts": b.active,
+                    "retiring": b.retiring_since is not None,
+                }
+                for b in self._browsers
+            ],
+            **(self.watchdog.snapshot() if self.watchdog else {}),
+        }
+
+    @asynccontextmanager
+    async def context(
+        self,
+        engine="firefox",
+        proxy=None,
+        profile: FingerprintProfile = None,
+        reuse: bool = False,
+        site: str | None = None,
+    ):
+        """
+        Entrega um contexto de um navegador aquecido.
+
+        Ao sair do bloco o navegador volta ao pool. Sem `reuse` o contexto é
+        fechado; com `reuse` suas páginas são fechadas e ele fica em cache,
+        indexado por (engine, perfil, proxy), para a próxima chamada com a
+        mesma chave.
+
+        Com `site` e `BrowserSettings.storage_state` ativo, o contexto nasce
+        com o último snapshot de cookies/localStorage do site para o mesmo
+        proxy (preferindo o perfil que gerou o snapshot) e, se o bloco termina
+        sem erro, o snapshot é atualizado.
+
+        Args:
+            engine: "firefox", "chromium", "random" ou "auto" (escolhida por
+                `select_engine` para `site`)
+            proxy: Configuração de proxy retornada por `get_proxy`
+            profile: Perfil de fingerprint. Se None, sorteia um compatível.
+                Ignorado no modo persistente (cada slot tem o seu)
+            reuse: Se deve reaproveitar/guardar o contexto no cache do pool
+            site: URL ou host a visitar (storage state e engine "auto")
+        """
+        if engine == "auto":
+            engine = select_engine(site, self.engines) if site else "random"
+
+        states = (
+            get_storage_states() if site and browser_settings.storage_state else None
+        )
+        if states and profile is None and not self.persistent:
+            engines = self.engines if engine == "random" else (engine,)
+            profile = states.profile_for(site, proxy, engines)
+
+        if engine == "random":
+            engine = profile.engine if profile else random.choice(self.engines)
+
+        if engine not in self.engines:
+            raise ValueError(f"Engine {engine} not recognized.")
+
+        if not self.started:
+            await self.start()
+
+        if self.persistent:
+            if proxy:
+                raise ValueError(
+                    "Contextos persistentes não aceitam proxy por contexto"
+                )
+            async with self._persistent_context(engine) as context:
+                yield context
+            return
+
+        profile = profile or random_profile(engine)
+        # O proxy inteiro entra na chave: gateways compartilham host:porta entre
+        # credenciais distintas
+        key = (engine, profile.id, tuple(sorted(proxy.items())) if proxy else None)
+
+        parked = await self._unpark(key) if reuse else None
+        if parked:
+            pooled, context = parked
+            track(context, "context")
+        else:
+            pooled = await self._acquire(engine)
+            context = None
+
+        try:
+            if context is None:
+                context = await set_context(
+                    pooled.browser,
+                    proxy=proxy,
+                    profile=profile,
+                    storage_state=(
+                        await states.load(site, proxy, profile) if states else None
+                    ),
+                )
+            self._track_navigations(pooled, context)
+            touch(context)
+            yield context
+            if states:
+                await states.save(context, site, proxy, profile)
+        finally:
+            try:
+                if context is not None:
+                    touch(context)
+                    if (
+                        reuse
+                        and not self.closed
+                        and pooled.is_connected()
+                        and pooled.retiring_since is None
+                    ):
+                        await self._park(key, pooled, context)
+                    else:
+                        await self._close_context(context)
+            finally:
+                await self._release(pooled)
+
+    @asynccontextmanager
+    async def _persistent_context(self, engine):
+        pooled = await self._acquire(engine)
+        try:
+            self._track_navigations(pooled, pooled.context)
+            yield pooled.context
+        finally:
+            if pooled.is_connected():
+                for page in pooled.context.pages:
+                    try:
+                        # Mede quanto da página veio do cache persistente
+                        await persistent_profiles.collect_cache_stats(page)
+                        await page.close()
+                    except Exception as err:
+                        logger.warning(f"Erro ao fechar página persistente: {err}")
+            await self._release(pooled)
+
+    def _track_navigations(self, pooled, context):
+        if not self.watchdog or context in self._tracked_contexts:
+            return
+        self._tracked_contexts.add(context)
+
+        def on_page(page):
+            def on_navigated(frame):
+                if frame == page.main_frame:
+                    pooled.navigations += 1
+
+            page.on("framenavigated", on_navigated)
+
+        for page in context.pages:
+            on_page(page)
+        context.on("page", on_page)
+
+    async def _close_context(self, context):
+        try:
+            await context.close()
+        except Exception as err:
+            logger.warning(f"Erro ao fechar contexto do pool: {err}")
+
+    async def _park(self, key, pooled, context):
+        try:
+            for page in context.pages:
+                await page.close()
+        except Exception as err:
+            # Página travada ou alvo fechado: o contexto não serve para reuso
+            logger.warning(f"Erro ao fechar página do contexto em cache: {err}")
+            await self._close_context(context)
+            return
+
+        # Contextos em cache pertencem ao pool, não são vazamentos
+        get_leak_tracker().untrack(context)
+
+        async with self._condition:
+            evicted = [self._parked.pop(key)] if key in self._parked else []
+            self._parked[key] = (pooled, context)
+            while len(self._parked) > browser_settings.context_cache_size:
+                evicted.append(self._parked.popitem(last=False)[1])
+
+        for _, old_context in evicted:
+            await self._close_context(old_context)
+
+    async def _unpark(self, key):
+        async with self._condition:
+            parked = self._parked.pop(key, None)
+            if parked is None:
+                return None
+
+            pooled, context = parked
+            if (
+                pooled not in self._browsers
+                or not pooled.is_connected()
+                or pooled.retiring_since is not None
+            ):
+                return None
+
+            pooled.active += 1
+            pooled.last_used = time.monotonic()
+            return parked
+
+    async def _warm_up(self, engine):
+        pooled = await self._launch(engine)
+        async with self._condition:
+            self._browsers.append(pooled)
+
+    async def _launch(self, engine):
+        if not self.watchdog or not procfs.available():
+            return await self._launch_browser(engine)
+
+        # Lançamentos em série para atribuir os processos novos ao navegador certo
+        async with self._launch_lock:
+            before = procfs.descendants(os.getpid())
+            pooled = await self._launch_browser(engine)
+            after = procfs.descendants(os.getpid())
+            pooled.pids = frozenset(
+                procfs.new_process_roots(before, after, self._driver_pids or None)
+            )
+            return pooled
+
+    async def _launch_browser(self, engine):
+        if self.persistent:
+            return await self._launch_persistent(engine)
+
+        browser = await set_browser(
+            self._playwright,
+            engine=engine,
+            headless=self.headless,
+            per_context_proxy=True,
+            profile=self.profile,
+        )
+        return _PooledBrowser(engine=engine, browser=browser)
+
+    async def _launch_persistent(self, engine):
+        # Um diretório de perfil só pode ser usado por um processo por vez: o
+        # lock de arquivo vale também para outros workers e pools
+        slot, lock = await asyncio.to_thread(
+            persistent_profiles.acquire_slot, engine, set(self._slots[engine])
+        )
+        self._slots[engine].add(slot)
+        pooled = _PooledBrowser(engine=engine, browser=None, slot=slot, slot_lock=lock)
+
+        try:
+            context = await set_persistent_context(
+                self._playwright,
+                engine,
+                slot=slot,
+                headless=self.headless,
+                profile=self.profile,
+            )
+        except BaseException:
+            self._free_slot(pooled)
+            raise
+
+        pooled.browser, pooled.context = context.browser, context
+        context.on("close", lambda _: setattr(pooled, "closed", True))
+        # O contexto persistente vive tanto quanto o slot, como um navegador
+        get_leak_tracker().untrack(context)
+        return pooled
+
+    async def _acquire(self, engine):
+        async with self._condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError("BrowserPool já foi fechado")
+
+                for dead in [b for b in self._browsers if not b.is_connected()]:
+                    self._browsers.remove(dead)
+                    self._free_slot(dead)
+
+                candidates = [
+                    b
+                    for b in self._browsers
+                    if b.engine == engine
+                    and b.active < self.max_contexts_per_browser
+                    and b.retiring_since is None
+                ]
+                if candidates:
+                    pooled = min(candidates, key=lambda b: b.active)
+                    pooled.active += 1
+                    pooled.last_used = time.monotonic()
+                    touch(pooled.browser)
+                    return pooled
+
+                engine_browsers = [
+                    b
+                    for b in self._browsers
+                    if b.engine == engine and b.retiring_since is None
+                ]
+                if len(engine_browsers) + self._launching[engine] < self.max_size:
+                    break
+
+                await self._condition.wait()
+
+            self._launching[engine] += 1
+
+        try:
+            pooled = await self._launch(engine)
+        except BaseException:
+            async with self._condition:
+                self._launching[engine] -= 1
+                self._condition.notify_all()
+            raise
+
+        async with self._condition:
+            self._launching[engine] -= 1
+            pooled.active = 1
+            self._browsers.append(pooled)
+            return pooled
+
+    async def _release(self, pooled):
+        async with self._condition:
+            pooled.active = max(0, pooled.active - 1)
+            pooled.last_used = time.monotonic()
+            touch(pooled.browser)
+            drained = (
+                pooled.retiring_since is not None
+                and not pooled.active
+                and pooled in self._browsers
+            )
+            if drained:
+                self._browsers.remove(pooled)
+            self._condition.notify_all()
+
+        if drained:
+            await self._close_browser(pooled)
+
+    async def _retire(self, pooled, reason):
+        async with self._condition:
+            if pooled.retiring_since is not None or pooled not in self._browsers:
+                return
+
+            pooled.retiring_since = time.monotonic()
+            parked_keys = [key for key, (p, _) in self._parked.items() if p is pooled]
+            parked = [self._parked.pop(key)[1] for key in parked_keys]
+            drained = not pooled.active
+            if drained:
+                self._browsers.remove(pooled)
+            # Libera espaço para um substituto em `_acquire`
+            self._condition.notify_all()
+
+        self.watchdog.record(pooled, reason)
+        for context in parked:
+            await self._close_context(context)
+        if drained:
+            await self._close_browser(pooled)
+
+    async def _watch_memory(self):
+        while True:
+            await asyncio.sleep(self.watchdog.interval)
+
+            async with self._condition:
+                browsers = list(self._browsers)
+
+            try:
+                to_recycle = await asyncio.to_thread(self.watchdog.inspect, browsers)
+            except Exception as err:
+                logger.warning(f"Erro ao amostrar memória dos navegadores: {err}")
+                continue
+
+            for pooled, reason in to_recycle:
+                await self._retire(pooled, reason)
+
+            now = time.monotonic()
+            async with self._condition:
+                stuck = [
+                    b
+                    for b in self._browsers
+                    if b.retiring_since is not None
+                    and now - b.retiring_since >= self.watchdog.drain_timeout
+                ]
+                for pooled in stuck:
+                    self._browsers.remove(pooled)
+                self._condition.notify_all()
+
+            for pooled in stuck:
+                logger.warning(
+                    f"Navegador {pooled.engine} com {pooled.active} contexto(s) "
+                    "ativo(s) após o prazo de drenagem; fechando à força"
+                )
+                await self._close_browser(pooled)
+
+            for engine in self.engines:
+                ready = [
+                    b
+                    for b in self._browsers
+                    if b.engine == engine and b.retiring_since is None
+                ]
+                missing = self.min_size - len(ready) - self._launching[engine]
+                for _ in range(max(0, missing)):
+                    try:
+                        await self._warm_up(engine)
+                    except Exception as err:
+                        logger.warning(f"Erro ao repor navegador {engine}: {err}")
+
+    async def _close_browser(self, pooled):
+        try:
+            await (pooled.context or pooled.browser).close()
+        except Exception as err:
+            logger.warning(f"Erro ao fechar navegador do pool: {err}")
+        finally:
+            self._free_slot(pooled)
+
+    def _free_slot(self, pooled):
+        if pooled.slot is not None:
+            self._slots[pooled.engine].discard(pooled.slot)
+        if pooled.slot_lock is not None:
+            pooled.slot_lock.close()
+            pooled.slot_lock = None
+
+    async def _reap_idle(self):
+        interval = max(5.0, self.idle_timeout / 2)
+        while True:
+            await asyncio.sleep(interval)
+
+            async with self._condition:
+                now = time.monotonic()
+                expired = []
+                for engine in self.engines:
+                    engine_browsers = [b for b in self._browsers if b.engine == engine]
+                    idle = [
+                        b
+                        for b in engine_browsers
+                        if not b.active and now - b.last_used >= self.idle_timeout
+                    ]
+                    removable = max(0, len(engine_browsers) - self.min_size)
+                    idle.sort(key=lambda b: b.last_used)
+                    expired.extend(idle[:removable])
+
+                for pooled in expired:
+                    self._browsers.remove(pooled)
+                for key, (pooled, _) in list(self._parked.items()):
+                    if pooled in expired:
+                        del self._parked[key]
+                self._condition.notify_all()
+
+            for pooled in expired:
+                logger.info(f"Fechando navegador ocioso ({pooled.engine})")
+                await self._close_browser(pooled)
+
+
+# Um pool por event loop: locks, tarefas e o driver pertencem ao loop que os
+# criou, então um novo `asyncio.run(...)` recebe um pool próprio
+_browser_pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+async def get_browser_pool(warm: bool = False) -> BrowserPool:
+    """
+    Retorna o pool de navegadores do event loop atual, iniciando-o se necessário.
+
+    Os navegadores são lançados sob demanda, só para as engines usadas. Feche
+    o pool com `close_browser_pool()` antes de o loop terminar.
+
+    Args:
+        warm: Se deve aquecer `BrowserSettings.pool_min_size` navegadores por
+            engine ao criar o pool
+    """
+    loop = asyncio.get_running_loop()
+    pool = _browser_pools.get(loop)
+
+    if pool is None or pool.closed:
+        pool = _browser_pools[loop] = BrowserPool(min_size=None if warm else 0)
+
+    return await pool.start()
+
+
+async def close_browser_pool():
+    """Fecha o pool de navegadores do event loop atual, se existir"""
+    if pool := _browser_pools.pop(asyncio.get_running_loop(), None):
+        await pool.close()
+
+
+async def navigate_hedged(
+    url,
+    extract,
+    engine="firefox",
+    proxy=None,
+    proxy_factory=None,
+    hedge_delay: float | None = None,
+    **navigate_kwargs,
+):
+    """
+    Navega com hedge: se a primeira tentativa não fizer commit até o atraso de
+    hedge (percentil das latências de commit), uma segunda tentativa começa com
+    outro proxy e outra engine. O primeiro resultado bem-sucedido vence e o
+    contexto perdedor é cancelado e fechado.
+
+    Args:
+        url: URL de destino
+        extract: Corrotina `extract(page)` que produz o resultado após a navegação
+        engine: Engine da tentativa primária
+        proxy: Proxy da tentativa primária
+        proxy_factory: Corrotina sem argumentos que retorna o proxy do hedge
+            (ex: `get_proxy`). Se None, o hedge reutiliza `proxy`
+        hedge_delay: Segundos até o hedge. Se None, usa `hedge_stats.hedge_delay()`
+        **navigate_kwargs: Repassados para `navigate_with_retry`
+
+    Returns:
+        Resultado de `extract` da tentativa vencedora
+    """
+    pool = await get_browser_pool()
+    hedge_engine = next((e for e in pool.engines if e != engine), engine)
+
+    async def hedge_proxy():
+        if not proxy_factory:
+            return proxy
+        for _ in range(3):
+            candidate = await proxy_factory()
+            if not proxy or candidate.get("server") != proxy.get("server"):
+                return candidate
+        return candidate
+
+    async def attempt(index, committed):
+        attempt_engine, attempt_proxy = (
+            (engine, proxy) if index == 0 else (hedge_engine, await hedge_proxy())
+        )
+
+        async with pool.context(
+            attempt_engine, proxy=attempt_proxy, site=url
+        ) as context:
+            page = await set_page(context)
+            page.on(
+                "framenavigated",
+                lambda frame: committed.set() if frame == page.main_frame else None,
+            )
+            await navigate_with_retry(page, url, **navigate_kwargs)
+            return await extract(page)
+
+    return await run_hedged(attempt, hedge_delay=hedge_delay)
@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+from .browser import PER_CONTEXT_PROXY_PLACEHOLDER, launch_options
+from .config import browser_settings
+
+# Nomes das opções de `launch()` no protocolo do driver
+SERVER_OPTION_NAMES = {
+    "args": "args",
+    "firefox_user_prefs": "firefoxUserPrefs",
+    "ignore_default_args": "ignoreDefaultArgs",
+}
+
+
+class BrowserServer:
+    """
+    Um processo `launch-server` com porta e caminho fixos, para que o endpoint
+    continue o mesmo depois de um reinício.
+
+    Args:
+        engine: "firefox" ou "chromium"
+        port: Porta local do websocket
+        profile: Perfil de `LAUNCH_PROFILES`
+        headless: Se o navegador deve rodar sem interface
+    """
+
+    def __init__(
+        self, engine: str, port: int, profile: str | None = None, headless=True
+    ):
+        self.engine = engine
+        self.port = port
+        self.profile = profile
+        self.headless = headless
+        self.ws_endpoint: str | None = None
+        self.restarts = 0
+        self.started_at: float | None = None
+        self._process = None
+        self._config_path: str | None = None
+        self._stdout_task = None
+
+    def config(self) -> dict:
+        """Opções de `launchServer` do driver"""
+        config = dict(
+            headless=self.headless,
+            host="127.0.0.1",
+            port=self.port,
+            wsPath=f"/{self.engine}-{self.port}",
+        )
+        for name, value in launch_options(self.engine, self.profile).items():
+            config[SERVER_OPTION_NAMES[name]] = value
+
+        # Mesmo proxy fictício de `set_browser(per_context_proxy=True)`
+        if self.engine in browser_settings.proxy_placeholder_engines:
+            config["proxy"] = PER_CONTEXT_PROXY_PLACEHOLDER
+
+        return config
+
+    @property
+    def pid(self) -> int | None:
+        return self._process.pid if self._process else None
+
+    async def start(self, timeout: float = 60.0):
+        fd, self._config_path = tempfile.mkstemp(
+            prefix="browser-server-", suffix=".json"
+        )
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.config(), f)
+
+        self._process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "playwright",
+            "launch-server",
+            "--browser",
+            self.engine,
+            "--config",
+            self._config_path,
+            stdout=asyncio.subprocess.PIPE,
+            # O CLI do Python roda o driver node como filho: sinais vão ao grupo
+            start_new_session=os.name == "posix",
+        )
+
+        try:
+            line = await asyncio.wait_for(self._process.stdout.readline(), timeout)
+        except asyncio.TimeoutError:
+            await self.stop()
+            raise RuntimeError(f"Servidor {self.engine}:{self.port} não respondeu")
+
+        if not line.startswith(b"ws"):
+            await self.stop()
+            raise RuntimeError(f"Servidor {self.engine}:{self.port} falhou ao iniciar")
+
+        self.ws_endpoint = line.decode().strip()
+        self.started_at = time.time()
+        self._stdout_task = asyncio.create_task(self._drain_stdout())
+        logger.info(f"Servidor {self.engine} no ar em {self.ws_endpoint}")
+
+    async def _drain_stdout(self):
+        # Evita que o pipe encha e trave o processo do driver
+        while await self._process.stdout.readline():
+            pass
+
+    async def healthy(self, timeout: float = 5.0) -> bool:
+        """Processo vivo e aceitando conexões na porta"""
+        if self._process is None or self._process.returncode is not None:
+            return False
+
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection("127.0.0.1", self.port), timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+        writer.close()
+        await writer.wait_closed()
+        return True
+
+    async def stop(self, timeout: float = 10.0):
+        if self._stdout_task:
+            self._stdout_task.cancel()
+            self._stdout_task = None
+
+        if self._process and self._process.returncode is None:
+            self._signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self._signal(signal.SIGKILL if os.name == "posix" else signal.SIGTERM)
+                await self._process.wait()
+
+        if self._config_path:
+            try:
+                os.unlink(self._config_path)
+            except OSError:
+                pass
+            self._config_path = None
+
+    def _signal(self, sig):
+        try:
+            if os.name == "posix":
+                os.killpg(self._process.pid, sig)
+            else:
+                self._process.send_signal(sig)
+        except ProcessLookupError:
+            pass
+
+    async def restart(self):
+        await self.stop()
+        await self.start()
+        self.restarts += 1
+
+
+class BrowserSupervisor:
+    """
+    Mantém um conjunto fixo de servidores por engine, reinicia os que param de
+    responder e publica os endpoints em `browser_servers_file`.
+
+    O Playwright para Python não expõe `launch_server`, então cada servidor é
+    um processo `python -m playwright launch-server` do driver. Vários workers
+    de um mesmo nó compartilham os navegadores conectando via `set_browser`
+    com `BROWSER_BROWSER_SERVERS=true`.
+
+    Exemplo:
+        python -m src.browser_server --engines chromium firefox --servers 2
+
+    Args:
+        engines: Engines servidas
+        servers_per_engine: Servidores por engine
+        base_port: Primeira porta. Se None, usa `BrowserSettings.browser_server_base_port`
+        profile: Perfil de `LAUNCH_PROFILES`
+        headless: Se os navegadores devem rodar sem interface
+        health_interval: Intervalo (s) entre verificações de saúde
+        registry_file: Arquivo de registro dos endpoints
+    """
+
+    def __init__(
+        self,
+        engines=("firefox", "chromium"),
+        servers_per_engine: int = 1,
+        base_port: int | None = None,
+        profile: str | None = None,
+        headless: bool = True,
+        health_interval: float | None = None,
+        registry_file: str | None = None,
+    ):
+        base_port = base_port or browser_settings.browser_server_base_port
+        self.servers = [
+            BrowserServer(engine, base_port + i, profile=profile, headless=headless)
+            for i, engine in enumerate(
+                e for e in engines for _ in range(servers_per_engine)
+            )
+        ]
+        self.health_interval = (
+            health_interval or browser_settings.browser_server_health_interval
+        )
+        self.registry_file = registry_file or browser_settings.browser_servers_file
+
+    def registry(self) -> dict:
+        servers = {}
+        for server in self.servers:
+            if server.ws_endpoint:
+                servers.setdefault(server.engine, []).append(server.ws_endpoint)
+        return {"pid": os.getpid(), "updated_at": time.time(), "servers": servers}
+
+    def publish(self):
+        """Grava o registro de endpoints de forma atômica"""
+        tmp_path = f"{self.registry_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registry(), f, indent=2)
+        os.replace(tmp_path, self.registry_file)
+
+    def unpublish(self):
+        try:
+            os.unlink(self.registry_file)
+        except OSError:
+            pass
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "engine": server.engine,
+                "ws_endpoint": server.ws_endpoint,
+                "pid": server.pid,
+                "restarts": server.restarts,
+            }
+            for server in self.servers
+        ]
+
+    async def start(self):
+        await asyncio.gather(*[server.start() for server in self.servers])
+        self.publish()
+
+    async def check(self):
+        """Reinicia os servidores que não passam na verificação de saúde"""
+        for server in self.servers:
+            if await server.healthy():
+                continue
+
+            logger.warning(f"Servidor {server.engine}:{server.port} caiu; reiniciando")
+            try:
+                await server.restart()
+            except Exception as err:
+                # Fica fora do registro até o próximo reinício dar certo
+                server.ws_endpoint = None
+                logger.error(f"Erro ao reiniciar {server.engine}:{server.port}: {err}")
+
+        self.publish()
+
+    async def run(self):
+        """Inicia os servidores e os supervisiona até ser cancelado"""
+        try:
+            await self.start()
+            while True:
+                await asyncio.sleep(self.health_interval)
+                await self.check()
+        finally:
+            self.unpublish()
+            await asyncio.gather(
+                *[server.stop() for server in self.servers], return_exceptions=True
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Servidores de navegador compartilhados"
+    )
+    parser.add_argument("--engines", nargs="+", default=["firefox", "chromium"])
+    parser.add_argument("--servers", type=int, default=1, help="Servidores por engine")
+    parser.add_argument("--base-port", type=int, default=None)
+    parser.add_argument("--profile", default=None, help="Perfil de lançamento")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    supervisor = BrowserSupervisor(
+        engines=args.engines,
+        servers_per_engine=args.servers,
+        base_port=args.base_port,
+        profile=args.profile,
+        headless=not args.headed,
+    )
+
+    try:
+        asyncio.run(supervisor.run())
+    except KeyboardInterrupt:
+        logger.info("Supervisor encerrado")
+
+
+if __name__ == "__main__":
+    main()
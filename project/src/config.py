@@ -1,4 +1,6 @@
-from typing import List, Tuple
+import re
+import sys
+from typing import List, Literal, Tuple
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
@@ -60,6 +62,297 @@ class BrowserSettings(BaseSettings):
         description="Range de tempo de sleep entre movimentos de tradução",
     )
 
+    # Launch settings
+    launch_profile: Literal["stealth", "lean", "minimal-memory"] = Field(
+        default="stealth",
+        description="Perfil de lançamento dos navegadores (ver LAUNCH_PROFILES)",
+    )
+
+    # Browser pool settings
+    pool_min_size: int = Field(
+        default=1, description="Número mínimo de navegadores aquecidos por engine"
+    )
+    pool_max_size: int = Field(
+        default=4, description="Número máximo de navegadores abertos por engine"
+    )
+    pool_max_contexts_per_browser: int = Field(
+        default=8, description="Número máximo de contextos simultâneos por navegador"
+    )
+    pool_idle_timeout: float = Field(
+        default=300.0,
+        description="Tempo (s) sem uso após o qual um navegador ocioso é fechado",
+    )
+
+    # Memory watchdog settings
+    browser_watchdog: bool = Field(
+        default=False,
+        description="Se o pool recicla navegadores por memória ou navegações",
+    )
+    browser_memory_limit_mb: int = Field(
+        default=1536, description="Teto de RSS (MB) da árvore de processos do navegador"
+    )
+    browser_max_navigations: int = Field(
+        default=500, description="Navegações antes de reciclar um navegador"
+    )
+    browser_watchdog_interval: float = Field(
+        default=15.0, description="Intervalo (s) entre amostras de memória"
+    )
+    browser_drain_timeout: float = Field(
+        default=120.0,
+        description="Tempo (s) máximo esperando contextos em uso antes de reciclar",
+    )
+
+    # Leak tracking settings
+    leak_tracking: bool = Field(
+        default=False,
+        description="Se navegadores, contextos e páginas abertos são rastreados",
+    )
+    leak_max_age: float = Field(
+        default=600.0,
+        description="Tempo (s) sem uso após o qual um contexto ou página é suspeito",
+    )
+    leak_action: Literal["warn", "close"] = Field(
+        default="warn",
+        description="O que fazer com objetos suspeitos: avisar ou fechar à força",
+    )
+    leak_check_interval: float = Field(
+        default=60.0, description="Intervalo (s) entre verificações de vazamento"
+    )
+
+    # Traffic metering settings
+    traffic_metering: bool = Field(
+        default=False,
+        description="Se deve medir pedidos e bytes por proxy e domínio",
+    )
+    traffic_snapshot_interval: float = Field(
+        default=60.0, description="Intervalo (s) entre snapshots de tráfego"
+    )
+    traffic_snapshot_file: str = Field(
+        default="traffic.json", description="Arquivo do snapshot de tráfego"
+    )
+
+    # Proxy settings
+    proxy_placeholder_engines: List[str] = Field(
+        default=["chromium"] if sys.platform == "win32" else [],
+        description=(
+            "Engines que precisam de um proxy global fictício para aceitar "
+            "proxies por contexto"
+        ),
+    )
+
+    # Fingerprint settings
+    fingerprint_pool_size: int = Field(
+        default=200, description="Perfis de fingerprint gerados por engine"
+    )
+    fingerprint_cache_file: str = Field(
+        default="fingerprints.json",
+        description="Arquivo de cache dos perfis de fingerprint",
+    )
+    fingerprint_cache_max_age: float = Field(
+        default=7 * 24 * 3600,
+        description="Idade máxima (s) do cache de perfis antes de regerá-lo",
+    )
+    context_cache_size: int = Field(
+        default=16,
+        description="Contextos reaproveitáveis mantidos abertos pelo pool",
+    )
+
+    # Persistent profile settings
+    persistent_profiles: bool = Field(
+        default=False,
+        description="Se o pool usa perfis persistentes (cache HTTP em disco)",
+    )
+    persistent_profiles_dir: str = Field(
+        default="browser_profiles",
+        description="Diretório dos perfis persistentes (um por engine e slot)",
+    )
+    persistent_cache_max_mb: int = Field(
+        default=256, description="Tamanho máximo (MB) do cache HTTP de cada perfil"
+    )
+
+    # Shared asset cache settings
+    asset_cache: bool = Field(
+        default=False,
+        description="Se deve servir recursos estáticos de um cache compartilhado",
+    )
+    asset_cache_dir: str = Field(
+        default="asset_cache",
+        description="Diretório do cache compartilhado de recursos estáticos",
+    )
+    asset_cache_memory_mb: int = Field(
+        default=64, description="Tamanho máximo (MB) do cache de recursos em memória"
+    )
+    asset_cache_disk_mb: int = Field(
+        default=512, description="Tamanho máximo (MB) do cache de recursos em disco"
+    )
+    asset_cache_resource_types: List[str] = Field(
+        default=["script", "stylesheet", "font", "image"],
+        description="Tipos de recurso servidos pelo cache compartilhado",
+    )
+    asset_cache_max_ttl: int = Field(
+        default=86400,
+        description="Frescor máximo (s) de um recurso antes de revalidar",
+    )
+
+    # Storage state settings
+    storage_state: bool = Field(
+        default=False,
+        description="Se o pool restaura e salva cookies/localStorage por site",
+    )
+    storage_state_dir: str = Field(
+        default="storage_states",
+        description="Diretório dos snapshots de storage state",
+    )
+    storage_state_ttl: int = Field(
+        default=6 * 3600, description="Validade (s) de um snapshot de storage state"
+    )
+    storage_state_max_entries: int = Field(
+        default=500, description="Número máximo de snapshots de storage state"
+    )
+
+    # Browser server settings
+    browser_servers: bool = Field(
+        default=False,
+        description="Se `set_browser` conecta aos servidores de navegador compartilhados",
+    )
+    browser_servers_file: str = Field(
+        default="browser_servers.json",
+        description="Registro dos endpoints publicados pelo supervisor",
+    )
+    browser_server_base_port: int = Field(
+        default=9300, description="Primeira porta usada pelos servidores de navegador"
+    )
+    browser_server_health_interval: float = Field(
+        default=10.0,
+        description="Intervalo (s) entre verificações de saúde dos servidores",
+    )
+    browser_server_connect_timeout_ms: int = Field(
+        default=30000, description="Timeout (ms) para conectar a um servidor"
+    )
+
+    # Resource blocking settings
+    block_resources: bool = Field(
+        default=False,
+        description="Se deve abortar pedidos de recursos desnecessários ao scraping",
+    )
+    blocked_resource_types: List[str] = Field(
+        default=["image", "media", "font", "stylesheet"],
+        description="Tipos de recurso do Playwright bloqueados",
+    )
+    blocked_url_patterns: List[str] = Field(
+        default=[],
+        description="Expressões regulares de URLs bloqueadas",
+    )
+
+    # Third-party domain blocklist settings
+    block_third_party_domains: bool = Field(
+        default=False,
+        description="Se deve bloquear domínios de rastreadores e widgets de terceiros",
+    )
+    blocklist_file: str | None = Field(
+        default=None,
+        description="Arquivo opcional com domínios extras (um por linha)",
+    )
+    blocklist_extra_domains: List[str] = Field(
+        default=[],
+        description="Domínios extras adicionados à lista de bloqueio embarcada",
+    )
+
+    # Navigation settings
+    navigation_mode: Literal["retry", "staged"] = Field(
+        default="retry",
+        description="Modo de navegação padrão de `navigate_with_retry`",
+    )
+    navigation_deadline_ms: int = Field(
+        default=45000, description="Prazo total (ms) por URL no modo 'staged'"
+    )
+    navigation_commit_strategy: Literal["commit", "domcontentloaded"] = Field(
+        default="domcontentloaded",
+        description="Primeira etapa aguardada no modo 'staged' (o `goto` só espera o commit)",
+    )
+    navigation_idle_stages: List[Literal["load", "networkidle", "domstable"]] = Field(
+        default=["load", "networkidle"],
+        description="Etapas opcionais aguardadas após o commit no modo 'staged'",
+    )
+    navigation_network_retries: int = Field(
+        default=2,
+        description="Renavegações permitidas após falhas reais de rede",
+    )
+
+    # Adaptive navigation settings
+    adaptive_navigation: bool = Field(
+        default=False,
+        description="Se deve aprender estratégia e timeout de navegação por host",
+    )
+    host_stats_file: str = Field(
+        default="host_stats.json",
+        description="Arquivo JSON com as estatísticas de navegação por host",
+    )
+    host_stats_max_samples: int = Field(
+        default=200, description="Latências mantidas por host e estratégia"
+    )
+    host_stats_max_hosts: int = Field(
+        default=5000,
+        description="Hosts mantidos nas estatísticas (os vistos há mais tempo saem)",
+    )
+    adaptive_timeout_factor: float = Field(
+        default=1.5, description="Multiplicador aplicado ao p95 para obter o timeout"
+    )
+    adaptive_min_timeout_ms: int = Field(
+        default=5000, description="Timeout adaptativo mínimo (ms)"
+    )
+
+    # Engine selection settings
+    engine_stats: bool = Field(
+        default=False,
+        description="Se as navegações registram sucesso e latência por engine e host",
+    )
+    engine_exploration: float = Field(
+        default=0.05,
+        description="Probabilidade de sortear a engine ao acaso no modo 'auto'",
+    )
+    engine_stats_decay: float = Field(
+        default=0.98,
+        description="Fator de esquecimento das estatísticas por engine a cada registro",
+    )
+
+    # Hedged navigation settings
+    hedge_navigation: bool = Field(
+        default=False,
+        description="Se deve disparar uma segunda navegação quando a primeira demora",
+    )
+    hedge_delay_ms: int = Field(
+        default=8000,
+        description="Atraso (ms) até o hedge enquanto não há latências suficientes",
+    )
+    hedge_percentile: float = Field(
+        default=90.0,
+        description="Percentil das latências de commit usado como atraso do hedge",
+    )
+    hedge_min_samples: int = Field(
+        default=20,
+        description="Latências de commit necessárias para usar o percentil",
+    )
+
+    # DOM readiness settings
+    dom_quiet_ms: int = Field(
+        default=500,
+        description="Janela sem mutações (ms) para considerar o DOM estável",
+    )
+    dom_stable_timeout_ms: int = Field(
+        default=15000, description="Tempo máximo (ms) aguardando o DOM estabilizar"
+    )
+
+    # Humanization settings
+    humanization_mode: Literal["off", "budgeted", "full"] = Field(
+        default="full",
+        description="Modo de humanização de `do_movements`",
+    )
+    humanization_budget_ms: int = Field(
+        default=1000,
+        description="Tempo máximo (ms) de movimentos no modo 'budgeted'",
+    )
+
     @field_validator("viewport_width_range", "viewport_height_range")
     @classmethod
     def validate_viewport_range(cls, v):
@@ -112,6 +405,151 @@ class BrowserSettings(BaseSettings):
             raise ValueError("Tempo de sleep deve ser positivo")
         return v
 
+    @field_validator(
+        "pool_max_size",
+        "pool_max_contexts_per_browser",
+        "fingerprint_pool_size",
+        "context_cache_size",
+        "persistent_cache_max_mb",
+        "asset_cache_memory_mb",
+        "asset_cache_disk_mb",
+    )
+    @classmethod
+    def validate_pool_positive(cls, v):
+        """Valida se os tamanhos de pool e cache são positivos"""
+        if v < 1:
+            raise ValueError("Valor deve ser pelo menos 1")
+        return v
+
+    @field_validator("pool_min_size")
+    @classmethod
+    def validate_pool_min_size(cls, v):
+        """Valida se o tamanho mínimo do pool não é negativo"""
+        if v < 0:
+            raise ValueError("Tamanho mínimo do pool não pode ser negativo")
+        return v
+
+    @field_validator("pool_idle_timeout")
+    @classmethod
+    def validate_pool_idle_timeout(cls, v):
+        """Valida se o tempo de ociosidade é positivo"""
+        if v <= 0:
+            raise ValueError("Tempo de ociosidade deve ser positivo")
+        return v
+
+    @field_validator(
+        "browser_memory_limit_mb",
+        "browser_max_navigations",
+        "browser_watchdog_interval",
+        "browser_drain_timeout",
+        "leak_max_age",
+        "leak_check_interval",
+        "traffic_snapshot_interval",
+    )
+    @classmethod
+    def validate_watchdog_positive(cls, v):
+        """Valida se os limites do watchdog e do rastreador de vazamentos são positivos"""
+        if v <= 0:
+            raise ValueError("Valor deve ser positivo")
+        return v
+
+    @field_validator("blocked_resource_types", "asset_cache_resource_types")
+    @classmethod
+    def validate_blocked_resource_types(cls, v):
+        """Valida se os tipos de recurso existem no Playwright"""
+        valid_types = {
+            "document",
+            "stylesheet",
+            "image",
+            "media",
+            "font",
+            "script",
+            "texttrack",
+            "xhr",
+            "fetch",
+            "eventsource",
+            "websocket",
+            "manifest",
+            "other",
+        }
+        for resource_type in v:
+            if resource_type not in valid_types:
+                raise ValueError(f"Tipo de recurso '{resource_type}' desconhecido")
+        return v
+
+    @field_validator("blocked_url_patterns")
+    @classmethod
+    def validate_blocked_url_patterns(cls, v):
+        """Valida se os padrões de URL são expressões regulares válidas"""
+        for pattern in v:
+            try:
+                re.compile(pattern)
+            except re.error as err:
+                raise ValueError(f"Padrão '{pattern}' inválido: {err}")
+        return v
+
+    @field_validator("navigation_deadline_ms", "dom_quiet_ms", "dom_stable_timeout_ms")
+    @classmethod
+    def validate_navigation_deadline(cls, v):
+        """Valida se os prazos de navegação são positivos"""
+        if v <= 0:
+            raise ValueError("Prazo deve ser positivo")
+        return v
+
+    @field_validator(
+        "host_stats_max_samples",
+        "host_stats_max_hosts",
+        "adaptive_timeout_factor",
+        "adaptive_min_timeout_ms",
+        "hedge_delay_ms",
+        "hedge_min_samples",
+        "humanization_budget_ms",
+        "asset_cache_max_ttl",
+        "storage_state_ttl",
+        "storage_state_max_entries",
+        "browser_server_base_port",
+        "browser_server_health_interval",
+        "browser_server_connect_timeout_ms",
+    )
+    @classmethod
+    def validate_adaptive_positive(cls, v):
+        """Valida se os parâmetros de navegação, humanização e cache são positivos"""
+        if v <= 0:
+            raise ValueError("Valor deve ser positivo")
+        return v
+
+    @field_validator("engine_exploration")
+    @classmethod
+    def validate_engine_exploration(cls, v):
+        """Valida se a taxa de exploração está entre 0 e 1"""
+        if not 0 <= v <= 1:
+            raise ValueError("Taxa de exploração deve estar entre 0 e 1")
+        return v
+
+    @field_validator("engine_stats_decay")
+    @classmethod
+    def validate_engine_stats_decay(cls, v):
+        """Valida se o fator de esquecimento está em (0, 1]"""
+        if not 0 < v <= 1:
+            raise ValueError("Fator de esquecimento deve estar em (0, 1]")
+        return v
+
+    @field_validator("hedge_percentile")
+    @classmethod
+    def validate_hedge_percentile(cls, v):
+        """Valida se o percentil do hedge está entre 0 e 100"""
+        if not 0 < v < 100:
+            raise ValueError("Percentil deve estar entre 0 e 100")
+        return v
+
+    @field_validator("navigation_network_retries")
+    @classmethod
+    def validate_navigation_network_retries(cls, v):
+        """Valida se o número de renavegações não é negativo"""
+        if v < 0:
+            raise ValueError("Número de renavegações não pode ser negativo")
+        return v
+
     @field_validator("locales")
     @classmethod
     def validate_locales(cls, v):
@@ -155,6 +593,75 @@ class ProxySettings(BaseSettings):
     proxies_file: str = Field(
         default="proxies.txt", description="Nome do arquivo de proxies"
     )
+    reload_interval: float = Field(
+        default=1.0,
+        description="Intervalo mínimo (s) entre verificações de mudança no arquivo",
+    )
+
+    # Health scoring settings
+    health_alpha: float = Field(
+        default=0.2,
+        description="Peso da observação mais recente nas médias móveis de saúde",
+    )
+    failure_threshold: int = Field(
+        default=3, description="Falhas seguidas que colocam um proxy em quarentena"
+    )
+    quarantine_base: float = Field(
+        default=30.0, description="Duração (s) da primeira quarentena"
+    )
+    quarantine_max: float = Field(
+        default=1800.0, description="Duração máxima (s) de uma quarentena"
+    )
+
+    # Probe settings
+    echo_endpoints: List[str] = Field(
+        default=[
+            "http://httpbin.org/ip",
+            "http://ipinfo.io/json",
+            "https://api.ipify.org?format=json",
+        ],
+        description="Endpoints que devolvem o IP de saída, disputados em paralelo",
+    )
+    probe: bool = Field(
+        default=False,
+        description="Se deve validar todos os proxies periodicamente em segundo plano",
+    )
+    probe_concurrency: int = Field(
+        default=20, description="Proxies testados simultaneamente pelo prober"
+    )
+    probe_interval: float = Field(
+        default=300.0, description="Intervalo (s) entre rodadas do prober"
+    )
+    probe_timeout: float = Field(
+        default=10.0, description="Timeout (s) de cada teste de proxy"
+    )
+    probe_results_file: str = Field(
+        default="proxy_probes.json",
+        description="Arquivo com os últimos resultados do prober",
+    )
+    probe_results_ttl: float = Field(
+        default=3600.0,
+        description="Idade (s) máxima de um resultado salvo usado ao iniciar",
+    )
+
+    # Affinity settings
+    affinity: bool = Field(
+        default=False,
+        description="Se cada domínio deve ficar no mesmo proxy, perfil e contexto",
+    )
+    affinity_max_requests: int = Field(
+        default=100, description="Requisições por domínio antes de trocar de proxy"
+    )
+    affinity_ttl: float = Field(
+        default=900.0, description="Duração (s) máxima do vínculo domínio-proxy"
+    )
+    affinity_max_bindings: int = Field(
+        default=1000, description="Número máximo de domínios com proxy vinculado"
+    )
+    affinity_min_success_rate: float = Field(
+        default=0.5,
+        description="Taxa de sucesso abaixo da qual o domínio troca de proxy",
+    )
 
     @field_validator("proxies_file")
     @classmethod
@@ -166,6 +673,67 @@ class ProxySettings(BaseSettings):
             raise ValueError("Arquivo de proxies deve ter extensão .txt")
         return v
 
+    @field_validator("health_alpha")
+    @classmethod
+    def validate_health_alpha(cls, v):
+        """Valida se o peso da média móvel está em (0, 1]"""
+        if not 0 < v <= 1:
+            raise ValueError("Peso deve estar em (0, 1]")
+        return v
+
+    @field_validator("failure_threshold", "quarantine_base", "quarantine_max")
+    @classmethod
+    def validate_quarantine_positive(cls, v):
+        """Valida se os parâmetros de quarentena são positivos"""
+        if v <= 0:
+            raise ValueError("Valor deve ser positivo")
+        return v
+
+    @field_validator("echo_endpoints")
+    @classmethod
+    def validate_echo_endpoints(cls, v):
+        """Valida se há ao menos um endpoint HTTP(S)"""
+        if not v:
+            raise ValueError("Informe ao menos um endpoint de eco")
+        for endpoint in v:
+            if not endpoint.startswith(("http://", "https://")):
+                raise ValueError(f"Endpoint de eco inválido: {endpoint}")
+        return v
+
+    @field_validator(
+        "probe_concurrency", "probe_interval", "probe_timeout", "probe_results_ttl"
+    )
+    @classmethod
+    def validate_probe_positive(cls, v):
+        """Valida se os parâmetros do prober são positivos"""
+        if v <= 0:
+            raise ValueError("Valor deve ser positivo")
+        return v
+
+    @field_validator("affinity_max_requests", "affinity_ttl", "affinity_max_bindings")
+    @classmethod
+    def validate_affinity_positive(cls, v):
+        """Valida se os limites da afinidade são positivos"""
+        if v <= 0:
+            raise ValueError("Valor deve ser positivo")
+        return v
+
+    @field_validator("affinity_min_success_rate")
+    @classmethod
+    def validate_affinity_min_success_rate(cls, v):
+        """Valida se a taxa de sucesso mínima está entre 0 e 1"""
+        if not 0 <= v <= 1:
+            raise ValueError("Taxa de sucesso deve estar entre 0 e 1")
+        return v
+
+    @field_validator("reload_interval")
+    @classmethod
+    def validate_reload_interval(cls, v):
+        """Valida se o intervalo de recarga não é negativo"""
+        if v < 0:
+            raise ValueError("Intervalo de recarga não pode ser negativo")
+        return v
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
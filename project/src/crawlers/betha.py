@@ -0,0 +1,216 @@
+import asyncio
+import json
+import os
+import random
+from typing import Dict, List
+
+from loguru import logger
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from ..browser import HumanizationPolicy, do_movements, get_browser_pool, set_page
+
+STATIC_SUFFIXES = (".js", ".css", ".ttf", ".svg", ".png", ".jpg")
+
+
+class MenuRequestNotFoundError(Exception):
+    """Exceção customizada para quando a requisição do menu não é encontrada."""
+
+    pass
+
+
+class JsonRequestError(Exception):
+    """Exceção customizada para quando há erro ao obter o JSON."""
+
+    pass
+
+
+def is_data_response(response) -> bool:
+    """Indica se a resposta é de dados (e não um arquivo estático)"""
+    return (
+        response.status == 200
+        and not response.url.endswith(STATIC_SUFFIXES)
+        and ".js?" not in response.url
+        and ".woff" not in response.url
+    )
+
+
+def is_menu_response(response) -> bool:
+    return is_data_response(response) and "/menu" in response.url
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    retry=retry_if_exception_type(
+        (PlaywrightTimeoutError, MenuRequestNotFoundError, JsonRequestError)
+    ),
+    reraise=True,
+)
+async def get_menu_info(
+    url: str,
+    count: int,
+    engine="random",
+    humanization: HumanizationPolicy = None,
+) -> List[Dict] | None:
+    """
+    Extrai informações de menu de um portal Betha com sistema de retries.
+
+    Args:
+        url: URL a ser processada
+        count: Contador do loop atual (usado para geração de ID)
+        engine: Engine do navegador retirado do pool
+        humanization: Política de humanização executada enquanto o menu não
+            chega. Se None, usa `BrowserSettings.humanization_mode`
+
+    Returns:
+        Lista de dicionários contendo informações de menu ou None em caso de falha
+    """
+    logger.info(f"[{count + 1}] Processando URL: {url}")
+    responses_list = []
+
+    def handle_response(response):
+        if is_data_response(response):
+            responses_list.append(response)
+
+    try:
+        pool = await get_browser_pool()
+
+        async with pool.context(engine) as context:
+            page = await set_page(context)
+
+            page.on("response", handle_response)
+            menu_response = asyncio.create_task(
+                page.wait_for_event(
+                    "response", predicate=is_menu_response, timeout=60000
+                )
+            )
+
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            except PlaywrightError as err:
+                # O menu pode ter chegado mesmo sem o DOM terminar de carregar
+                if (
+                    not isinstance(err, PlaywrightTimeoutError)
+                    or not menu_response.done()
+                ):
+                    menu_response.cancel()
+                    raise
+
+            try:
+                # A humanização corre em paralelo e para quando o menu chega
+                menu_request = await do_movements(
+                    page, policy=humanization, until=menu_response
+                )
+            except PlaywrightTimeoutError:
+                logger.error(
+                    "Requisição de menu não encontrada. "
+                    f"Total de respostas: {len(responses_list)}"
+                )
+                captured_urls = [resp.url for resp in responses_list]
+                logger.error(f"URLs capturadas: {captured_urls[:5]}...")
+                raise MenuRequestNotFoundError("Requisição de menu não encontrada")
+
+            try:
+                menu_json = await menu_request.json()
+            except Exception as e:
+                body_text = await menu_request.text()
+                logger.error(
+                    f"Erro ao processar JSON: {str(e)}. "
+                    f"Corpo da resposta (primeiros 100 caracteres): {body_text[:100]}..."
+                )
+                raise JsonRequestError(f"Erro ao processar JSON: {str(e)}")
+
+            if not isinstance(menu_json, list) or len(menu_json) == 0:
+                raise JsonRequestError("Dados JSON inválidos ou vazios")
+
+            return menu_json
+
+    except (PlaywrightTimeoutError, MenuRequestNotFoundError, JsonRequestError) as e:
+        logger.warning(f"Erro durante a tentativa: {str(e)}. Tentando novamente...")
+        raise
+
+    except Exception as e:
+        logger.error(f"Erro inesperado: {str(e)}")
+        return None
+
+
+def save_to_json(data: Dict, filename: str):
+    """
+    Salva ou atualiza os dados no arquivo JSON.
+
+    Args:
+        data: Dicionário com os dados a serem salvos
+        filename: Nome do arquivo JSON
+    """
+    existing_data = {}
+    if os.path.exists(filename):
+        with open(filename, "r", encoding="utf-8") as f:
+            try:
+                existing_data = json.load(f)
+            except json.JSONDecodeError:
+                logger.warning("Erro ao carregar o arquivo JSON existente.")
+
+    existing_data.update(data)
+
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(existing_data, f, ensure_ascii=False, indent=2)
+
+
+async def process_urls(list_urls: List[str], output_file: str = "menu_data.json"):
+    """
+    Processa uma lista de URLs de portais e salva os menus encontrados.
+
+    Args:
+        list_urls: Lista de URLs a serem processadas
+        output_file: Nome do arquivo de saída
+
+    Returns:
+        dict: Quantidade de URLs processadas e com falha
+    """
+    total_urls = len(list_urls)
+    processed = 0
+    failed = 0
+
+    logger.info(f"Iniciando processamento de {total_urls} URLs...")
+
+    for count, url in enumerate(list_urls):
+        try:
+            menu_info = await get_menu_info(url, count)
+        except Exception as e:
+            menu_info = None
+            logger.error(f"[{count + 1}/{total_urls}] Erro ao processar {url}: {e}")
+
+        if menu_info:
+            portal_ids = [item.get("portal") for item in menu_info if "portal" in item]
+
+            if portal_ids and portal_ids[0] is not None:
+                idx = portal_ids[0]
+            else:
+                idx = 2000 + count
+                for item in menu_info:
+                    item.setdefault("portal", idx)
+
+            save_to_json({str(idx): menu_info}, output_file)
+
+            processed += 1
+            logger.info(f"[{count + 1}/{total_urls}] Sucesso! ID do portal: {idx}")
+        else:
+            failed += 1
+            logger.warning(f"[{count + 1}/{total_urls}] Falha ao processar URL: {url}")
+
+        # Pausa aleatória entre requisições para evitar detecção
+        await asyncio.sleep(random.uniform(1, 3))
+
+    logger.info(
+        f"Processamento concluído! Total: {total_urls} | "
+        f"Sucesso: {processed} | Falhas: {failed}"
+    )
+
+    return {"processed": processed, "failed": failed}
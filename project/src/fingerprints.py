@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from .config import browser_settings
+
+# Timezones coerentes com cada locale
+LOCALE_TIMEZONES = {
+    "pt-BR": [
+        "America/Sao_Paulo",
+        "America/Rio_Branco",
+        "America/Manaus",
+        "America/Fortaleza",
+        "America/Recife",
+        "America/Belem",
+        "America/Bahia",
+        "America/Cuiaba",
+    ],
+    "es-AR": ["America/Argentina/Buenos_Aires", "America/Argentina/Cordoba"],
+    "es-UY": ["America/Montevideo"],
+    "es-PY": ["America/Asuncion"],
+    "es-CL": ["America/Santiago"],
+    "es-CO": ["America/Bogota"],
+    "es-MX": ["America/Mexico_City"],
+    "en-US": ["America/New_York", "America/Chicago", "America/Los_Angeles"],
+}
+
+# Resoluções de tela de desktop mais comuns (largura, altura)
+DESKTOP_VIEWPORTS = [
+    (1920, 1080),
+    (1366, 768),
+    (1536, 864),
+    (1440, 900),
+    (1280, 720),
+    (1600, 900),
+    (1280, 800),
+    (1680, 1050),
+    (1280, 1024),
+    (1024, 768),
+]
+
+# Marcas de user agent compatíveis com cada engine do Playwright
+ENGINE_BROWSERS = {"chromium": ("chrome", "edge"), "firefox": ("firefox",)}
+
+MOBILE_MARKERS = ("Mobile", "Android", "iPhone", "iPad", "CrOS")
+
+
+@dataclass(frozen=True)
+class FingerprintProfile:
+    """Conjunto internamente coerente de atributos de um contexto"""
+
+    id: str
+    engine: str
+    user_agent: str
+    platform: str
+    viewport_width: int
+    viewport_height: int
+    locale: str
+    timezone_id: str
+    has_touch: bool
+
+    @property
+    def languages(self) -> list[str]:
+        return [self.locale, self.locale.split("-")[0]]
+
+    def context_options(self) -> dict:
+        """Opções de `browser.new_context` correspondentes ao perfil"""
+        return dict(
+            user_agent=self.user_agent,
+            viewport={"width": self.viewport_width, "height": self.viewport_height},
+            locale=self.locale,
+            timezone_id=self.timezone_id,
+            has_touch=self.has_touch,
+        )
+
+    def init_script(self) -> str:
+        """Script que alinha `navigator.languages` e `navigator.platform`"""
+        return f"""
+Object.defineProperty(navigator, 'languages', {{
+    get: () => {json.dumps(self.languages)}
+}});
+
+Object.defineProperty(navigator, 'platform', {{
+    get: () => {json.dumps(self.platform)}
+}});
+"""
+
+
+def platform_of(user_agent: str) -> str | None:
+    """Valor de `navigator.platform` coerente com o user agent"""
+    if "Windows" in user_agent:
+        return "Win32"
+    if "Macintosh" in user_agent:
+        return "MacIntel"
+    if "Linux" in user_agent:
+        return "Linux x86_64"
+    return None
+
+
+def _locale_timezone_pairs(settings):
+    pairs = [
+        (locale, timezone)
+        for locale in settings.locales
+        for timezone in LOCALE_TIMEZONES.get(locale, [])
+        if timezone in settings.timezones
+    ]
+    if not pairs:
+        logger.warning("Nenhum par locale/timezone coerente; usando combinações")
+        pairs = [(lc, tz) for lc in settings.locales for tz in settings.timezones]
+    return pairs
+
+
+def _viewports(settings):
+    (min_w, max_w), (min_h, max_h) = (
+        settings.viewport_width_range,
+        settings.viewport_height_range,
+    )
+    viewports = [
+        (w, h)
+        for w, h in DESKTOP_VIEWPORTS
+        if min_w <= w <= max_w and min_h <= h <= max_h
+    ]
+    return viewports or [(max_w, max_h)]
+
+
+def _random_desktop_user_agent(ua, engine: str) -> str:
+    for _ in range(50):
+        user_agent = getattr(ua, random.choice(ENGINE_BROWSERS[engine]))
+        if platform_of(user_agent) and not any(m in user_agent for m in MOBILE_MARKERS):
+            return user_agent
+    raise RuntimeError(f"Nenhum user agent de desktop encontrado para {engine}")
+
+
+def build_profiles(engine: str, size: int, settings=browser_settings):
+    """Gera `size` perfis coerentes para a engine"""
+    from fake_useragent import UserAgent
+
+    ua = UserAgent()
+    pairs = _locale_timezone_pairs(settings)
+    viewports = _viewports(settings)
+
+    profiles = []
+    for _ in range(size):
+        user_agent = _random_desktop_user_agent(ua, engine)
+        platform = platform_of(user_agent)
+        locale, timezone_id = random.choice(pairs)
+        width, height = random.choice(viewports)
+        # Telas sensíveis ao toque só em notebooks Windows, e raramente
+        has_touch = platform == "Win32" and random.random() < 0.1
+
+        key = (
+            f"{engine}|{user_agent}|{locale}|{timezone_id}|{width}x{height}|{has_touch}"
+        )
+        profiles.append(
+            FingerprintProfile(
+                id=hashlib.sha1(key.encode()).hexdigest()[:12],
+                engine=engine,
+                user_agent=user_agent,
+                platform=platform,
+                viewport_width=width,
+                viewport_height=height,
+                locale=locale,
+                timezone_id=timezone_id,
+                has_touch=has_touch,
+            )
+        )
+    return profiles
+
+
+def _settings_key(settings) -> str:
+    relevant = [
+        settings.locales,
+        settings.timezones,
+        settings.viewport_width_range,
+        settings.viewport_height_range,
+        settings.fingerprint_pool_size,
+    ]
+    return hashlib.sha1(json.dumps(relevant).encode()).hexdigest()
+
+
+class FingerprintPool:
+    """
+    Pool de perfis de fingerprint construído sob demanda e salvo em disco.
+
+    O `fake_useragent` só é carregado quando o cache não existe, está velho
+    (`fingerprint_cache_max_age`) ou foi gerado com outras configurações.
+    Depois disso, sortear um perfil custa O(1).
+    """
+
+    def __init__(self, path=None, size: int | None = None, settings=browser_settings):
+        self.path = Path(path or settings.fingerprint_cache_file)
+        self.size = size or settings.fingerprint_pool_size
+        self.settings = settings
+        self._profiles: dict[str, list[FingerprintProfile]] | None = None
+        self._by_id: dict[str, FingerprintProfile] = {}
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        age = time.time() - data.get("created_at", 0)
+        if data.get("settings_key") != _settings_key(self.settings):
+            return None
+        if age > self.settings.fingerprint_cache_max_age:
+            return None
+
+        return {
+            engine: [FingerprintProfile(**profile) for profile in profiles]
+            for engine, profiles in data["profiles"].items()
+        }
+
+    def _save(self, profiles):
+        data = {
+            "created_at": time.time(),
+            "settings_key": _settings_key(self.settings),
+            "profiles": {
+                engine: [asdict(profile) for profile in engine_profiles]
+                for engine, engine_profiles in profiles.items()
+            },
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as err:
+            logger.warning(f"Erro ao salvar perfis de fingerprint: {err}")
+
+    @property
+    def profiles(self) -> dict[str, list[FingerprintProfile]]:
+        if self._profiles is None:
+            profiles = self._load()
+            if profiles is None:
+                logger.info(f"Gerando {self.size} perfis de fingerprint por engine")
+                profiles = {
+                    engine: build_profiles(engine, self.size, self.settings)
+                    for engine in ENGINE_BROWSERS
+                }
+                self._save(profiles)
+            self._profiles = profiles
+            self._by_id = {p.id: p for ps in profiles.values() for p in ps}
+        return self._profiles
+
+    def random(self, engine: str) -> FingerprintProfile:
+        """Sorteia um perfil compatível com a engine"""
+        return random.choice(self.profiles[engine])
+
+    def get(self, profile_id: str) -> FingerprintProfile | None:
+        self.profiles
+        return self._by_id.get(profile_id)
+
+
+_fingerprint_pool: FingerprintPool | None = None
+
+
+def get_fingerprint_pool() -> FingerprintPool:
+    """Retorna o pool global de perfis de fingerprint"""
+    global _fingerprint_pool
+
+    if _fingerprint_pool is None:
+        _fingerprint_pool = FingerprintPool()
+
+    return _fingerprint_pool
+
+
+def random_profile(engine: str) -> FingerprintProfile:
+    return get_fingerprint_pool().random(engine)
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from .config import browser_settings
+from .host_stats import percentile
+
+
+@dataclass
+class HedgeStats:
+    """Contadores das navegações com hedge"""
+
+    requests: int = 0
+    hedged: int = 0
+    primary_wins: int = 0
+    hedge_wins: int = 0
+    failures: int = 0
+    commit_latencies: deque = field(default_factory=lambda: deque(maxlen=500))
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.requests if self.requests else 0.0
+
+    @property
+    def hedge_win_rate(self) -> float:
+        return self.hedge_wins / self.hedged if self.hedged else 0.0
+
+    def hedge_delay(self) -> float:
+        """
+        Atraso (s) antes de disparar o hedge: o percentil configurado das
+        latências de commit observadas, ou o valor padrão sem histórico.
+        """
+        if len(self.commit_latencies) < browser_settings.hedge_min_samples:
+            return browser_settings.hedge_delay_ms / 1000
+
+        return percentile(self.commit_latencies, browser_settings.hedge_percentile)
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "primary_wins": self.primary_wins,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+            "hedge_rate": round(self.hedge_rate, 4),
+            "hedge_win_rate": round(self.hedge_win_rate, 4),
+            "hedge_delay_s": round(self.hedge_delay(), 3),
+        }
+
+
+hedge_stats = HedgeStats()
+
+
+async def _watch_commit(event: asyncio.Event, started: float, stats: HedgeStats):
+    await event.wait()
+    stats.commit_latencies.append(time.monotonic() - started)
+
+
+async def run_hedged(attempt, hedge_delay: float | None = None, stats=None):
+    """
+    Executa `attempt` e, se ele não fizer commit a tempo, dispara uma segunda
+    tentativa em paralelo. O primeiro sucesso vence e o perdedor é cancelado
+    (seus blocos `async with` fecham contexto e página).
+
+    Args:
+        attempt: Função `attempt(index, committed)` que retorna uma corrotina.
+            `index` é 0 para a tentativa primária e 1 para o hedge; a corrotina
+            deve chamar `committed.set()` quando a navegação fizer commit.
+        hedge_delay: Segundos até disparar o hedge. Se None, usa
+            `stats.hedge_delay()`
+        stats: Contadores a atualizar. Se None, usa `hedge_stats`
+
+    Returns:
+        Resultado da tentativa vencedora
+
+    Raises:
+        Exception: Erro da tentativa primária se ambas falharem
+    """
+    stats = stats or hedge_stats
+    hedge_delay = stats.hedge_delay() if hedge_delay is None else hedge_delay
+    stats.requests += 1
+
+    tasks = {}
+    watchers = []
+
+    def start(index):
+        committed = asyncio.Event()
+        started = time.monotonic()
+        task = asyncio.create_task(attempt(index, committed))
+        tasks[task] = index
+        watchers.append(asyncio.create_task(_watch_commit(committed, started, stats)))
+        return committed
+
+    try:
+        primary_committed = start(0)
+        primary = next(iter(tasks))
+        commit_wait = asyncio.create_task(primary_committed.wait())
+        await asyncio.wait(
+            {primary, commit_wait},
+            timeout=hedge_delay,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        commit_wait.cancel()
+
+        primary_ok = (
+            primary.done() and not primary.cancelled() and not primary.exception()
+        )
+        if not primary_committed.is_set() and not primary_ok:
+            logger.info(f"Sem commit após {hedge_delay:.1f}s, disparando hedge")
+            stats.hedged += 1
+            start(1)
+
+        errors = {}
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if tasks[task] == 0:
+                        stats.primary_wins += 1
+                    else:
+                        stats.hedge_wins += 1
+                    return task.result()
+                errors[tasks[task]] = task.exception()
+
+        stats.failures += 1
+        raise errors[min(errors)]
+
+    finally:
+        leftovers = [task for task in tasks if not task.done()] + watchers
+        for task in leftovers:
+            task.cancel()
+        await asyncio.gather(*leftovers, return_exceptions=True)
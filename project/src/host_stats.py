@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from .config import browser_settings
+
+# Chave usada para registrar as navegações do modo "staged"
+STAGED_KEY = "staged"
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def percentile(values, q: float) -> float | None:
+    """Percentil `q` (0-100) por interpolação linear; None se vazio"""
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class HostStatsStore:
+    """
+    Estatísticas de navegação por host persistidas em JSON.
+
+    Para cada host e estratégia de espera ("networkidle", "domcontentloaded",
+    "load" ou o modo "staged") guarda sucessos, falhas e as últimas latências
+    de sucesso, permitindo começar pela estratégia vencedora com um timeout
+    derivado do p95 observado.
+
+    Os hosts ficam em ordem de último registro e, acima de `max_hosts`, os
+    vistos há mais tempo são descartados. Dentro de um event loop a gravação
+    periódica roda em uma thread.
+
+    Args:
+        path: Arquivo JSON. Se None, usa `BrowserSettings.host_stats_file`
+        max_samples: Latências mantidas por estratégia
+        save_interval: Intervalo mínimo (s) entre gravações em disco
+        max_hosts: Hosts mantidos. Se None, usa `BrowserSettings.host_stats_max_hosts`
+    """
+
+    def __init__(
+        self,
+        path=None,
+        max_samples: int | None = None,
+        save_interval=30.0,
+        max_hosts: int | None = None,
+    ):
+        self.path = Path(path or browser_settings.host_stats_file)
+        self.max_samples = max_samples or browser_settings.host_stats_max_samples
+        self.save_interval = save_interval
+        self.max_hosts = max_hosts or browser_settings.host_stats_max_hosts
+        self._hosts: dict = {}
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._save_task = None
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._hosts = json.load(f)
+        except (OSError, json.JSONDecodeError) as err:
+            logger.warning(f"Erro ao carregar estatísticas de hosts: {err}")
+            self._hosts = {}
+
+        # O arquivo guarda os hosts em ordem de uso: mantém os mais recentes
+        for host in list(self._hosts)[: max(0, len(self._hosts) - self.max_hosts)]:
+            del self._hosts[host]
+
+    def _write(self, data: str):
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        """Grava as estatísticas de forma atômica (ex: ao encerrar)"""
+        self._write(json.dumps(self._hosts))
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    async def _save_async(self, data: str):
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError as err:
+            logger.warning(f"Erro ao gravar estatísticas de hosts: {err}")
+
+    def maybe_save(self):
+        """Grava se houver mudanças e o intervalo mínimo tiver passado"""
+        if not self._dirty or time.monotonic() - self._last_save < self.save_interval:
+            return
+        if self._save_task is not None and not self._save_task.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            try:
+                self.save()
+            except OSError as err:
+                logger.warning(f"Erro ao gravar estatísticas de hosts: {err}")
+            return
+
+        # Serializa no loop (instantâneo consistente) e grava fora dele
+        data = json.dumps(self._hosts)
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._save_task = loop.create_task(self._save_async(data))
+
+    def host(self, host: str) -> dict:
+        """Estatísticas do host, marcado como o mais recente"""
+        entry = self._hosts.pop(host, None)
+        if entry is None:
+            entry = {}
+            while len(self._hosts) >= self.max_hosts:
+                del self._hosts[next(iter(self._hosts))]
+        self._hosts[host] = entry
+        return entry
+
+    def _entry(self, host: str, strategy: str) -> dict:
+        return (
+            self.host(host)
+            .setdefault("strategies", {})
+            .setdefault(strategy, {"successes": 0, "failures": 0, "latencies": []})
+        )
+
+    def record(self, host: str, strategy: str, latency_ms: float, success: bool):
+        """Registra o resultado de uma navegação"""
+        entry = self._entry(host, strategy)
+        if success:
+            entry["successes"] += 1
+            entry["latencies"].append(round(latency_ms))
+            del entry["latencies"][: -self.max_samples]
+        else:
+            entry["failures"] += 1
+        self._dirty = True
+        self.maybe_save()
+
+    def p95(self, host: str, strategy: str) -> float | None:
+        entry = self._hosts.get(host, {}).get("strategies", {}).get(strategy)
+        return percentile(entry["latencies"], 95) if entry else None
+
+    def adaptive_timeout(self, host: str, strategy: str, max_timeout: int):
+        """Timeout (ms) derivado do p95 da estratégia, ou None sem histórico"""
+        p95 = self.p95(host, strategy)
+        if p95 is None:
+            return None
+
+        timeout = p95 * browser_settings.adaptive_timeout_factor
+        return int(
+            min(max_timeout, max(browser_settings.adaptive_min_timeout_ms, timeout))
+        )
+
+    def record_engine(self, host: str, engine: str, latency_ms: float, success: bool):
+        """
+        Registra o resultado de uma navegação completa com a engine. As
+        contagens de todas as engines do host decaem a cada registro, para
+        que a escolha se adapte quando o site muda.
+        """
+        engines = self.host(host).setdefault("engines", {})
+        decay = browser_settings.engine_stats_decay
+        for entry in engines.values():
+            entry["successes"] *= decay
+            entry["failures"] *= decay
+
+        entry = engines.setdefault(
+            engine, {"successes": 0.0, "failures": 0.0, "latency_ms": None}
+        )
+        if success:
+            entry["successes"] += 1
+            previous = entry["latency_ms"]
+            entry["latency_ms"] = round(
+                latency_ms if previous is None else 0.8 * previous + 0.2 * latency_ms
+            )
+        else:
+            entry["failures"] += 1
+        self._dirty = True
+        self.maybe_save()
+
+    def choose_engine(self, host: str, engines) -> str:
+        """
+        Escolhe a engine por amostragem de Thompson: sorteia a taxa de sucesso
+        de cada engine de uma Beta(sucessos + 1, falhas + 1) e fica com o menor
+        tempo esperado por sucesso (latência / taxa). Com probabilidade
+        `engine_exploration` sorteia uniformemente.
+        """
+        engines = list(engines)
+        if random.random() < browser_settings.engine_exploration:
+            return random.choice(engines)
+
+        known = self._hosts.get(host, {}).get("engines", {})
+        latencies = [e["latency_ms"] for e in known.values() if e["latency_ms"]]
+        # Engines sem latência medida herdam a mediana das demais
+        default_latency = percentile(latencies, 50) or 1000
+
+        def expected_cost(engine):
+            entry = known.get(engine, {})
+            rate = random.betavariate(
+                entry.get("successes", 0) + 1, entry.get("failures", 0) + 1
+            )
+            return (entry.get("latency_ms") or default_latency) / rate
+
+        return min(engines, key=expected_cost)
+
+    def best_strategy(self, host: str, strategies) -> str | None:
+        """
+        Estratégia com maior taxa de sucesso (com suavização de Laplace),
+        desempatando pelo menor p95. None se o host não tem histórico.
+        """
+        known = self._hosts.get(host, {}).get("strategies", {})
+        candidates = [s for s in strategies if known.get(s, {}).get("successes")]
+        if not candidates:
+            return None
+
+        def score(strategy):
+            entry = known[strategy]
+            total = entry["successes"] + entry["failures"]
+            rate = (entry["successes"] + 1) / (total + 2)
+            return (-rate, self.p95(host, strategy) or float("inf"))
+
+        return min(candidates, key=score)
+
+    def recommend(self, host: str, strategy_priority, timeouts):
+        """
+        Reordena as estratégias e ajusta os timeouts a partir do histórico.
+
+        Returns:
+            tuple: (strategy_priority, timeouts) originais se não há histórico
+        """
+        best = self.best_strategy(host, strategy_priority)
+        if best is None:
+            return tuple(strategy_priority), list(timeouts)
+
+        ordered = (best,) + tuple(s for s in strategy_priority if s != best)
+        timeout = self.adaptive_timeout(host, best, max(timeouts))
+        return ordered, [timeout, min(max(timeouts), timeout * 2)]
+
+
+_host_stats: HostStatsStore | None = None
+
+
+def get_host_stats() -> HostStatsStore:
+    """Retorna o armazenamento global de estatísticas de hosts"""
+    global _host_stats
+
+    if _host_stats is None:
+        _host_stats = HostStatsStore()
+
+    return _host_stats
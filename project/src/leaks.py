@@ -0,0 +1,186 @@
+import asyncio
+import time
+import traceback
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from .config import browser_settings
+
+# Evento emitido pelo Playwright quando cada tipo de objeto deixa de existir
+CLOSE_EVENTS = {"browser": "disconnected", "context": "close", "page": "close"}
+
+
+@dataclass
+class TrackedObject:
+    """Objeto do Playwright vivo e onde ele foi criado"""
+
+    kind: str
+    stack: list[str]
+    created_at: float = field(default_factory=time.monotonic)
+    touched_at: float = field(default_factory=time.monotonic)
+    warned: bool = False
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    @property
+    def idle(self) -> float:
+        return time.monotonic() - self.touched_at
+
+    def describe(self) -> dict:
+        return {
+            "kind": self.kind,
+            "age_s": round(self.age, 1),
+            "idle_s": round(self.idle, 1),
+            "stack": self.stack,
+        }
+
+
+class LeakTracker:
+    """
+    Rastreia navegadores, contextos e páginas abertos por `set_browser`,
+    `set_context` e `set_page` até o evento de fechamento de cada um.
+
+    Objetos sem uso há mais de `max_age` segundos (ver `touch`) são reportados
+    com a pilha de criação e, com `action="close"`, fechados à força.
+
+    Args:
+        max_age: Tempo (s) sem uso a partir do qual um objeto é suspeito
+        action: "warn" para só registrar ou "close" para fechar os suspeitos
+        kinds: Tipos verificados por idade (navegadores são de longa duração)
+        interval: Intervalo (s) entre verificações automáticas
+        stack_depth: Quadros da pilha de criação guardados
+    """
+
+    def __init__(
+        self,
+        max_age: float | None = None,
+        action: str | None = None,
+        kinds=("context", "page"),
+        interval: float | None = None,
+        stack_depth: int = 8,
+    ):
+        self.max_age = max_age or browser_settings.leak_max_age
+        self.action = action or browser_settings.leak_action
+        self.kinds = frozenset(kinds)
+        self.interval = interval or browser_settings.leak_check_interval
+        self.stack_depth = stack_depth
+        self.force_closed: Counter = Counter()
+        self._objects = weakref.WeakKeyDictionary()
+        self._listening = weakref.WeakSet()
+        self._task = None
+
+    def track(self, obj, kind: str):
+        """Passa a rastrear `obj` até seu evento de fechamento"""
+        if obj in self._objects:
+            self.touch(obj)
+            return
+
+        # Descarta este quadro e o de `track` do módulo
+        frames = traceback.extract_stack(limit=self.stack_depth + 2)[:-2]
+        stack = [f"{f.filename}:{f.lineno} in {f.name}" for f in frames]
+        self._objects[obj] = TrackedObject(kind=kind, stack=stack)
+
+        # Retomado (ex: contexto tirado do cache do pool): o ouvinte de
+        # fechamento continua registrado desde o primeiro `track`
+        if obj not in self._listening:
+            self._listening.add(obj)
+            obj.once(CLOSE_EVENTS[kind], lambda *_: self.untrack(obj))
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def untrack(self, obj):
+        self._objects.pop(obj, None)
+
+    def touch(self, obj):
+        """
+        Marca o objeto como em uso. Chamado pelo pool ao entregar e devolver
+        navegadores e contextos e por `navigate_with_retry` a cada navegação.
+        """
+        if tracked := self._objects.get(obj):
+            tracked.touched_at = time.monotonic()
+            tracked.warned = False
+
+    def live_counts(self) -> dict[str, int]:
+        counts = Counter(tracked.kind for tracked in list(self._objects.values()))
+        return {kind: counts.get(kind, 0) for kind in CLOSE_EVENTS}
+
+    def suspects(
+        self, max_age: float | None = None
+    ) -> list[tuple[object, TrackedObject]]:
+        """Objetos dos tipos verificados sem uso há mais de `max_age` segundos"""
+        max_age = self.max_age if max_age is None else max_age
+        return [
+            (obj, tracked)
+            for obj, tracked in list(self._objects.items())
+            if tracked.kind in self.kinds and tracked.idle >= max_age
+        ]
+
+    def report(self) -> dict:
+        return {
+            "live": self.live_counts(),
+            "force_closed": dict(self.force_closed),
+            "suspects": [tracked.describe() for _, tracked in self.suspects()],
+        }
+
+    async def check(self, max_age: float | None = None, action: str | None = None):
+        """Reporta (e opcionalmente fecha) os objetos suspeitos de vazamento"""
+        action = action or self.action
+        suspects = self.suspects(max_age)
+
+        for obj, tracked in suspects:
+            if not tracked.warned:
+                tracked.warned = True
+                logger.warning(
+                    f"Possível vazamento: {tracked.kind} sem uso há "
+                    f"{tracked.idle:.0f}s, criado em:\n  " + "\n  ".join(tracked.stack)
+                )
+            if action != "close":
+                continue
+
+            try:
+                await obj.close()
+                self.force_closed[tracked.kind] += 1
+            except Exception as err:
+                logger.debug(f"Erro ao fechar {tracked.kind} vazado: {err}")
+            self.untrack(obj)
+
+        return [tracked for _, tracked in suspects]
+
+    async def _run(self):
+        while self._objects:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+
+_leak_tracker: LeakTracker | None = None
+
+
+def get_leak_tracker() -> LeakTracker:
+    """Retorna o rastreador global de vazamentos"""
+    global _leak_tracker
+
+    if _leak_tracker is None:
+        _leak_tracker = LeakTracker()
+
+    return _leak_tracker
+
+
+def track(obj, kind: str):
+    """Rastreia `obj` se `BrowserSettings.leak_tracking` estiver ativo"""
+    if browser_settings.leak_tracking:
+        get_leak_tracker().track(obj, kind)
+    return obj
+
+
+def touch(*objs):
+    """Marca objetos rastreados como em uso, ver `LeakTracker.touch`"""
+    if browser_settings.leak_tracking:
+        tracker = get_leak_tracker()
+        for obj in objs:
+            tracker.touch(obj)
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import os
+import time
+import weakref
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+
+from loguru import logger
+
+from .config import browser_settings
+from .host_stats import host_of
+
+# Pedidos atendidos sem passar pelo proxy (cache de recursos ou bloqueio)
+_local_requests = weakref.WeakSet()
+# Pedidos cujo tráfego já foi contabilizado por `meter_fetch`
+_metered_requests = weakref.WeakSet()
+
+
+def mark_local(request):
+    """Marca um pedido servido localmente, que não gera tráfego no proxy"""
+    if browser_settings.traffic_metering:
+        _local_requests.add(request)
+
+
+def mark_metered(request):
+    """Marca um pedido já contabilizado, ignorado pelos eventos da página"""
+    if browser_settings.traffic_metering:
+        _metered_requests.add(request)
+
+
+def _headers_size(headers: dict | None) -> int:
+    # Aproximação do tamanho em HTTP/1.1: "nome: valor\r\n"
+    return sum(len(k) + len(v) + 4 for k, v in (headers or {}).items())
+
+
+@dataclass
+class TrafficCounters:
+    """Tráfego acumulado de um proxy ou domínio"""
+
+    requests: int = 0
+    errors: int = 0
+    local: int = 0
+    bytes_up: int = 0
+    bytes_down: int = 0
+
+    @property
+    def bytes_total(self) -> int:
+        return self.bytes_up + self.bytes_down
+
+
+class TrafficMeter:
+    """
+    Contabiliza pedidos, erros e bytes enviados e recebidos por proxy e por
+    domínio de destino, a partir dos eventos `requestfinished` e
+    `requestfailed` de cada contexto.
+
+    Os bytes vêm de `request.sizes()` (cabeçalhos e corpo, como transferidos).
+    Pedidos marcados com `mark_local` (cache de recursos e bloqueios) contam
+    à parte e não somam bytes. Requisições que não passam pelos eventos de
+    página (`context.request` e o `route.fetch` do cache de recursos) são
+    contabilizadas com `meter_fetch`. Um snapshot é gravado em `snapshot_file`
+    a cada `interval` segundos enquanto houver contextos medidos.
+
+    Args:
+        interval: Intervalo (s) entre snapshots. Se None, usa `BrowserSettings.traffic_snapshot_interval`
+        snapshot_file: Arquivo JSON do snapshot
+    """
+
+    def __init__(self, interval: float | None = None, snapshot_file=None):
+        self.interval = interval or browser_settings.traffic_snapshot_interval
+        self.snapshot_file = snapshot_file or browser_settings.traffic_snapshot_file
+        self.started_at = time.time()
+        self.by_proxy: dict[str, TrafficCounters] = defaultdict(TrafficCounters)
+        self.by_domain: dict[str, TrafficCounters] = defaultdict(TrafficCounters)
+        self._contexts = weakref.WeakSet()
+        self._proxy_ids = weakref.WeakKeyDictionary()
+        self._task = None
+
+    def install(self, context, proxy=None):
+        """Passa a medir os pedidos do contexto, atribuídos a `proxy`"""
+        if context in self._contexts:
+            return
+        self._contexts.add(context)
+
+        proxy_id = proxy.get("server", "direct") if proxy else "direct"
+        self._proxy_ids[context] = proxy_id
+
+        async def on_finished(request):
+            if not request.url.startswith("http") or request in _metered_requests:
+                return
+            if request in _local_requests:
+                self.record(proxy_id, request.url, local=True)
+                return
+            try:
+                sizes = await request.sizes()
+            except Exception:
+                sizes = {}
+            self.record(
+                proxy_id,
+                request.url,
+                bytes_up=sizes.get("requestHeadersSize", 0)
+                + sizes.get("requestBodySize", 0),
+                bytes_down=sizes.get("responseHeadersSize", 0)
+                + sizes.get("responseBodySize", 0),
+            )
+
+        def on_failed(request):
+            if not request.url.startswith("http") or request in _metered_requests:
+                return
+            local = request in _local_requests
+            self.record(proxy_id, request.url, error=not local, local=local)
+
+        context.on("requestfinished", on_finished)
+        context.on("requestfailed", on_failed)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def proxy_of(self, context) -> str:
+        return self._proxy_ids.get(context, "direct") if context else "direct"
+
+    def record(
+        self,
+        proxy_id: str,
+        url: str,
+        bytes_up: int = 0,
+        bytes_down: int = 0,
+        error: bool = False,
+        local: bool = False,
+    ):
+        for counters in (self.by_proxy[proxy_id], self.by_domain[host_of(url)]):
+            counters.requests += 1
+            counters.errors += error
+            counters.local += local
+            # Tamanhos desconhecidos vêm como -1
+            counters.bytes_up += max(0, bytes_up)
+            counters.bytes_down += max(0, bytes_down)
+
+    def snapshot(self) -> dict:
+        def export(counters: dict[str, TrafficCounters]):
+            ordered = sorted(
+                counters.items(), key=lambda item: item[1].bytes_total, reverse=True
+            )
+            return {
+                key: {**asdict(c), "bytes_total": c.bytes_total} for key, c in ordered
+            }
+
+        return {
+            "started_at": self.started_at,
+            "at": time.time(),
+            "by_proxy": export(self.by_proxy),
+            "by_domain": export(self.by_domain),
+        }
+
+    def save(self):
+        """Grava o snapshot de forma atômica"""
+        snapshot = self.snapshot()
+        tmp_path = f"{self.snapshot_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, self.snapshot_file)
+
+    async def _run(self):
+        while self._contexts:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.save)
+            except OSError as err:
+                logger.warning(f"Erro ao salvar snapshot de tráfego: {err}")
+
+
+_traffic_meter: TrafficMeter | None = None
+
+
+def get_traffic_meter() -> TrafficMeter:
+    """Retorna o medidor global de tráfego"""
+    global _traffic_meter
+
+    if _traffic_meter is None:
+        _traffic_meter = TrafficMeter()
+
+    return _traffic_meter
+
+
+async def meter_fetch(
+    context, url: str, response=None, request_headers=None, body: bytes | None = None
+):
+    """
+    Contabiliza uma requisição feita fora dos eventos de página, pelo
+    `context.request` ou por `route.fetch` (cache de recursos). Os tamanhos são
+    estimados pelos cabeçalhos e pelo corpo; sem `response`, conta como erro.
+
+    Args:
+        context: Contexto cujo proxy atendeu a requisição
+        url: URL requisitada
+        response: `APIResponse` recebida, ou None se a requisição falhou
+        request_headers: Cabeçalhos enviados
+        body: Corpo já lido da resposta, para não lê-lo de novo
+    """
+    if not browser_settings.traffic_metering:
+        return
+
+    meter = get_traffic_meter()
+    bytes_up = len(url) + _headers_size(request_headers)
+    if response is None:
+        meter.record(meter.proxy_of(context), url, bytes_up=bytes_up, error=True)
+        return
+
+    if body is not None:
+        body_size = len(body)
+    elif (length := response.headers.get("content-length", "")).isdigit():
+        body_size = int(length)
+    else:
+        try:
+            body_size = len(await response.body())
+        except Exception:
+            body_size = 0
+
+    meter.record(
+        meter.proxy_of(context),
+        url,
+        bytes_up=bytes_up,
+        bytes_down=_headers_size(response.headers) + body_size,
+    )
+
+
+def install_metering(context, proxy=None):
+    """Mede o contexto se `BrowserSettings.traffic_metering` estiver ativo"""
+    if browser_settings.traffic_metering:
+        get_traffic_meter().install(context, proxy)
@@ -0,0 +1,212 @@
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from .config import browser_settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Diretórios de cache HTTP dentro dos perfis do Chromium e do Firefox
+CACHE_DIR_NAMES = {"Cache", "Cache_Data", "Code Cache", "GPUCache", "cache2"}
+
+FINGERPRINT_FILE = "fingerprint.json"
+
+
+def profile_dir(engine: str, slot: int) -> Path:
+    """Diretório do perfil persistente de uma engine e slot de worker"""
+    return Path(browser_settings.persistent_profiles_dir) / f"{engine}-{slot}"
+
+
+def lock_slot(engine: str, slot: int):
+    """
+    Trava o slot com um lock de arquivo, válido entre processos e entre pools
+    do mesmo processo (Chromium recusa dois donos do mesmo diretório).
+
+    Returns:
+        Arquivo de trava aberto (fechá-lo libera o slot), ou None se o slot já
+        tem dono
+    """
+    path = Path(browser_settings.persistent_profiles_dir) / f"{engine}-{slot}.lock"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock = open(path, "a+")
+    try:
+        if fcntl:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+def acquire_slot(engine: str, skip=()) -> tuple[int, object]:
+    """Menor slot livre da engine e sua trava (ver `lock_slot`)"""
+    slot = 0
+    while True:
+        if slot not in skip and (lock := lock_slot(engine, slot)):
+            return slot, lock
+        slot += 1
+
+
+def cache_dirs(user_data_dir: Path) -> list[Path]:
+    return [
+        Path(root) / name
+        for root, dirs, _ in os.walk(user_data_dir)
+        for name in dirs
+        if name in CACHE_DIR_NAMES
+    ]
+
+
+def _cache_files(user_data_dir: Path):
+    for directory in cache_dirs(user_data_dir):
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = Path(root) / name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                yield path, stat
+
+
+def cache_size_bytes(user_data_dir: Path) -> int:
+    return sum(stat.st_size for _, stat in _cache_files(user_data_dir))
+
+
+def prune_cache(user_data_dir: Path, max_bytes: int) -> int:
+    """
+    Apaga os arquivos de cache mais antigos até o total ficar abaixo de 80% do
+    limite. Deve ser chamado com o navegador fechado.
+
+    Returns:
+        int: Bytes removidos
+    """
+    files = sorted(_cache_files(user_data_dir), key=lambda item: item[1].st_mtime)
+    total = sum(stat.st_size for _, stat in files)
+    if total <= max_bytes:
+        return 0
+
+    target = int(max_bytes * 0.8)
+    removed = 0
+    for path, stat in files:
+        if total - removed <= target:
+            break
+        try:
+            path.unlink()
+            removed += stat.st_size
+        except OSError:
+            continue
+
+    logger.info(f"Cache de {user_data_dir} reduzido em {removed / 2**20:.1f} MB")
+    return removed
+
+
+def cache_size_options(engine: str, max_bytes: int) -> dict:
+    """Opções de lançamento que limitam o cache em disco da engine"""
+    match engine:
+        case "chromium":
+            return {"args": [f"--disk-cache-size={max_bytes}"]}
+        case "firefox":
+            return {
+                "firefox_user_prefs": {
+                    "browser.cache.disk.enable": True,
+                    "browser.cache.disk.smart_size.enabled": False,
+                    "browser.cache.disk.capacity": max_bytes // 1024,
+                }
+            }
+        case _:
+            raise ValueError(f"Engine {engine} not recognized.")
+
+
+def load_slot_fingerprint(user_data_dir: Path) -> str | None:
+    """Id do perfil de fingerprint usado pelo slot (mantém o slot coerente)"""
+    try:
+        with open(user_data_dir / FINGERPRINT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("id")
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_slot_fingerprint(user_data_dir: Path, profile_id: str):
+    with open(user_data_dir / FINGERPRINT_FILE, "w", encoding="utf-8") as f:
+        json.dump({"id": profile_id}, f)
+
+
+def reset_profile(engine: str, slot: int):
+    """Remove o perfil persistente de um slot"""
+    shutil.rmtree(profile_dir(engine, slot), ignore_errors=True)
+
+
+# Lê as entradas de Resource Timing da página: transferSize é 0 quando o
+# recurso veio do cache (recursos cross-origin sem Timing-Allow-Origin
+# reportam tudo zerado e são contados como opacos)
+RESOURCE_TIMING_SCRIPT = """
+() => performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .map(e => [e.transferSize, e.encodedBodySize])
+"""
+
+
+@dataclass
+class CacheStats:
+    """Bytes servidos pelo cache HTTP do navegador durante a execução"""
+
+    hits: int = 0
+    hit_bytes: int = 0
+    revalidated: int = 0
+    revalidated_bytes: int = 0
+    network: int = 0
+    network_bytes: int = 0
+    opaque: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hit_bytes + self.revalidated_bytes + self.network_bytes
+        return (self.hit_bytes + self.revalidated_bytes) / total if total else 0.0
+
+    def record(self, transfer_size: int, encoded_size: int):
+        if not transfer_size and not encoded_size:
+            self.opaque += 1
+        elif transfer_size == 0:
+            self.hits += 1
+            self.hit_bytes += encoded_size
+        elif transfer_size < encoded_size:
+            # Resposta 304: só os cabeçalhos trafegaram
+            self.revalidated += 1
+            self.revalidated_bytes += encoded_size - transfer_size
+        else:
+            self.network += 1
+            self.network_bytes += transfer_size
+
+    def snapshot(self) -> dict:
+        return asdict(self) | {"hit_ratio": round(self.hit_ratio, 4)}
+
+
+cache_stats = CacheStats()
+
+
+async def collect_cache_stats(page, stats: CacheStats = None) -> CacheStats:
+    """
+    Acumula em `stats` (padrão: `cache_stats` da execução) os acertos de cache
+    da página atual. Chame antes de navegar para outra URL ou fechar a página.
+    """
+    stats = stats or cache_stats
+    try:
+        entries = await page.evaluate(RESOURCE_TIMING_SCRIPT)
+    except Exception as err:
+        logger.debug(f"Erro ao ler Resource Timing: {err}")
+        return stats
+
+    for transfer_size, encoded_size in entries:
+        stats.record(int(transfer_size or 0), int(encoded_size or 0))
+    return stats
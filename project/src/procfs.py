@@ -0,0 +1,96 @@
+import os
+from collections import defaultdict
+from pathlib import Path
+
+PROC = Path("/proc")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def available() -> bool:
+    """Indica se o /proc do Linux está disponível"""
+    return (PROC / "self" / "statm").exists()
+
+
+def rss_bytes(pid: int) -> int:
+    """Memória residente (RSS) de um processo, ou 0 se ele não existir mais"""
+    try:
+        with open(PROC / str(pid) / "statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def parent_pid(pid: int) -> int | None:
+    try:
+        with open(PROC / str(pid) / "stat", "r") as f:
+            # O nome do processo (campo 2) pode conter espaços e parênteses
+            return int(f.read().rsplit(")", 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def cmdline(pid: int) -> str:
+    """Linha de comando de um processo, com os argumentos separados por espaço"""
+    try:
+        with open(PROC / str(pid) / "cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def children_map() -> dict[int, list[int]]:
+    """Mapa pid -> filhos de todos os processos visíveis"""
+    children = defaultdict(list)
+    for entry in PROC.iterdir():
+        if entry.name.isdigit():
+            pid = int(entry.name)
+            if (ppid := parent_pid(pid)) is not None:
+                children[ppid].append(pid)
+    return children
+
+
+def descendants(pid: int, children: dict | None = None) -> set[int]:
+    """Todos os descendentes de um processo"""
+    children = children_map() if children is None else children
+    found = set()
+    stack = list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        if child not in found:
+            found.add(child)
+            stack.extend(children.get(child, []))
+    return found
+
+
+def tree_rss_bytes(pid: int, children: dict | None = None) -> int:
+    """RSS somado de um processo e de todos os seus descendentes"""
+    children = children_map() if children is None else children
+    return rss_bytes(pid) + sum(rss_bytes(p) for p in descendants(pid, children))
+
+
+def playwright_drivers(pid: int | None = None) -> set[int]:
+    """Processos `run-driver` do Playwright filhos de `pid` (padrão: este processo)"""
+    children = children_map()
+    return {
+        child
+        for child in children.get(pid or os.getpid(), [])
+        if "run-driver" in cmdline(child)
+    }
+
+
+def new_process_roots(
+    before: set[int], after: set[int], parents: set[int] | None = None
+) -> set[int]:
+    """
+    Processos novos cujo pai não é novo, ou seja, as raízes das árvores
+    criadas entre os dois instantâneos (ex: o processo principal de um
+    navegador recém-lançado).
+
+    Com `parents`, só contam os filhos diretos desses processos: passe o pid
+    do driver do Playwright para ignorar processos lançados por outras partes
+    do programa no mesmo intervalo.
+    """
+    new = after - before
+    if parents is not None:
+        return {pid for pid in new if parent_pid(pid) in parents}
+    return {pid for pid in new if parent_pid(pid) not in new}
@@ -1,4 +1,10 @@
+import asyncio
+import json
+import os
 import random
+import re
+import time
+from dataclasses import asdict, dataclass, field
 
 import httpx
 from loguru import logger
@@ -11,11 +17,471 @@ from tenacity import (
 
 from .config import proxy_settings
 
+# Intervalo (s) máximo entre recálculos dos pesos de seleção: as médias móveis
+# mudam aos poucos, então os pesos não são refeitos a cada resultado
+WEIGHTS_REFRESH_INTERVAL = 5.0
+
 
 class InvalidProxyError(Exception):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class ProxyRecord:
+    """Linha `ip:porta:usuário:senha` do arquivo de proxies"""
+
+    ip: str
+    port: str
+    username: str
+    password: str
+
+    @property
+    def server(self) -> str:
+        return f"http://{self.ip}:{self.port}"
+
+    def config(self) -> dict:
+        """Configuração de proxy no formato do Playwright"""
+        return {
+            "server": self.server,
+            "username": self.username,
+            "password": self.password,
+        }
+
+
+@dataclass
+class ProxyHealth:
+    """Saúde observada de um proxy"""
+
+    success_rate: float = 1.0
+    latency_ms: float | None = None
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_failure: float | None = None
+    quarantines: int = 0
+    quarantined_until: float = 0.0
+
+    def quarantined(self, now: float | None = None) -> bool:
+        return (now or time.time()) < self.quarantined_until
+
+    def weight(self, default_latency_ms: float) -> float:
+        """Peso de seleção: taxa de sucesso por segundo de latência"""
+        latency_s = (self.latency_ms or default_latency_ms) / 1000
+        return max(self.success_rate, 0.01) / (0.5 + latency_s)
+
+    def record(self, success: bool, latency_ms: float | None = None) -> bool:
+        """Registra um resultado; retorna True se o proxy entrou em quarentena"""
+        alpha = proxy_settings.health_alpha
+        self.success_rate = (1 - alpha) * self.success_rate + alpha * success
+
+        if success:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.quarantines = 0
+            if latency_ms is not None:
+                self.latency_ms = (
+                    latency_ms
+                    if self.latency_ms is None
+                    else (1 - alpha) * self.latency_ms + alpha * latency_ms
+                )
+            return False
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_failure = time.time()
+        if self.consecutive_failures >= proxy_settings.failure_threshold:
+            # Cool-down exponencial a cada quarentena sem sucesso no meio
+            cooldown = min(
+                proxy_settings.quarantine_max,
+                proxy_settings.quarantine_base * 2**self.quarantines,
+            )
+            self.quarantined_until = self.last_failure + cooldown
+            self.quarantines += 1
+            self.consecutive_failures = 0
+            logger.warning(f"Proxy em quarentena por {cooldown:.0f}s")
+            return True
+        return False
+
+
+@dataclass
+class ProbeResult:
+    """Resultado do teste de um proxy contra os endpoints de eco"""
+
+    server: str
+    ok: bool
+    latency_ms: float | None = None
+    exit_ip: str | None = None
+    endpoint: str | None = None
+    error: str | None = None
+    at: float = field(default_factory=time.time)
+
+
+def parse_proxies(text: str) -> tuple[ProxyRecord, ...]:
+    """Interpreta o arquivo de proxies, ignorando linhas vazias ou inválidas"""
+    records = []
+    invalid = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split(":")
+        if len(parts) != 4:
+            invalid += 1
+            continue
+        records.append(ProxyRecord(*parts))
+
+    if invalid:
+        logger.warning(f"{invalid} linha(s) inválida(s) no arquivo de proxies")
+    return tuple(records)
+
+
+class ProxyPool:
+    """
+    Proxies do arquivo mantidos em memória.
+
+    O arquivo é lido e interpretado uma única vez e recarregado apenas quando
+    seu mtime muda (verificado no máximo a cada `reload_interval` segundos).
+    Leitura e `stat` rodam fora do event loop.
+
+    A escolha é ponderada pela saúde de cada proxy (`ProxyHealth`, alimentada
+    por `report`): taxa de sucesso e latência em médias móveis. Proxies com
+    falhas seguidas ficam em quarentena com cool-down exponencial. Os pesos
+    acumulados ficam em cache e só são recalculados quando um proxy entra ou
+    sai de quarentena, quando o arquivo muda ou a cada
+    `WEIGHTS_REFRESH_INTERVAL` segundos, então a escolha é uma busca binária.
+
+    Args:
+        path: Arquivo de proxies. Se None, usa `ProxySettings.proxies_file`
+        reload_interval: Intervalo mínimo (s) entre verificações de mtime
+    """
+
+    def __init__(self, path=None, reload_interval: float | None = None):
+        self.path = path or proxy_settings.proxies_file
+        self.reload_interval = (
+            proxy_settings.reload_interval
+            if reload_interval is None
+            else reload_interval
+        )
+        self.records: tuple[ProxyRecord, ...] = ()
+        self.health: dict[str, ProxyHealth] = {}
+        self._cum_weights: list[float] | None = None
+        self._weights_expire = float("inf")
+        self._mtime: float | None = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self.records)
+
+    def _read_if_changed(self, mtime):
+        current = os.stat(self.path).st_mtime_ns
+        if current == mtime:
+            return current, None
+        with open(self.path, "r") as f:
+            return current, f.read()
+
+    async def refresh(self, force: bool = False):
+        """Recarrega o arquivo se o mtime mudou desde a última leitura"""
+        if not force and time.monotonic() - self._checked_at < self.reload_interval:
+            return
+
+        async with self._lock:
+            if not force and time.monotonic() - self._checked_at < self.reload_interval:
+                return
+
+            mtime, text = await asyncio.to_thread(
+                self._read_if_changed, None if force else self._mtime
+            )
+            self._checked_at = time.monotonic()
+            if text is None:
+                return
+
+            self.records = parse_proxies(text)
+            self._cum_weights = None
+            self._mtime = mtime
+            logger.info(f"{len(self.records)} proxies carregados de {self.path}")
+
+    def _health(self, server: str) -> ProxyHealth:
+        if server not in self.health:
+            self.health[server] = ProxyHealth()
+        return self.health[server]
+
+    def report(self, server: str, success: bool, latency_ms: float | None = None):
+        """Registra o resultado de uma navegação ou requisição pelo proxy"""
+        if self._health(server).record(success, latency_ms):
+            # Tirar o proxy da seleção não pode esperar o próximo recálculo
+            self._cum_weights = None
+
+    def _compute_weights(self, now: float):
+        latencies = sorted(
+            h.latency_ms for h in self.health.values() if h.latency_ms is not None
+        )
+        default_latency = latencies[len(latencies) // 2] if latencies else 1000.0
+
+        total = 0.0
+        cum_weights = []
+        self._weights_expire = now + WEIGHTS_REFRESH_INTERVAL
+        for record in self.records:
+            health = self.health.get(record.server)
+            if health is None:
+                total += ProxyHealth.weight(ProxyHealth(), default_latency)
+            elif health.quarantined(now):
+                self._weights_expire = min(
+                    self._weights_expire, health.quarantined_until
+                )
+            else:
+                total += health.weight(default_latency)
+            cum_weights.append(total)
+        self._cum_weights = cum_weights
+
+    def choose(self) -> ProxyRecord:
+        """Escolhe um proxy ponderado pela saúde, fora de quarentena"""
+        if not self.records:
+            raise InvalidProxyError(f"Nenhum proxy válido em {self.path}")
+
+        now = time.time()
+        if self._cum_weights is None or now >= self._weights_expire:
+            self._compute_weights(now)
+
+        if not self._cum_weights[-1]:
+            # Todos em quarentena: usa o que sai primeiro em vez de parar tudo
+            logger.warning("Todos os proxies estão em quarentena")
+            return min(
+                self.records, key=lambda r: self.health[r.server].quarantined_until
+            )
+
+        return random.choices(self.records, cum_weights=self._cum_weights)[0]
+
+    async def random(self) -> ProxyRecord:
+        await self.refresh()
+        return self.choose()
+
+    def seed(self, results: dict[str, ProbeResult]):
+        """Pré-ordena o pool com resultados salvos do prober (ver `ProxyProber`)"""
+        for server, result in results.items():
+            if server not in self.health:
+                self.health[server] = ProxyHealth(
+                    success_rate=1.0 if result.ok else 0.0,
+                    latency_ms=result.latency_ms,
+                )
+        self._cum_weights = None
+
+
+def mask_ip(text: str) -> str:
+    """Substitui os dois últimos octetos de IPs por ***"""
+    return re.sub(r"(\d+\.\d+\.)\d+\.\d+", r"\1***.***", text)
+
+
+def _proxy_url(proxy_config) -> str:
+    host = proxy_config["server"].removeprefix("http://")
+    if proxy_config.get("username"):
+        return (
+            f"http://{proxy_config['username']}:{proxy_config.get('password', '')}"
+            f"@{host}"
+        )
+    return f"http://{host}"
+
+
+async def _echo(client, endpoint: str) -> tuple[str, str]:
+    response = await client.get(endpoint)
+    response.raise_for_status()
+    try:
+        data = response.json()
+        ip = data.get("origin") or data.get("ip")
+    except ValueError:
+        ip = response.text.strip()
+    if not ip:
+        raise ValueError(f"{endpoint} não devolveu o IP")
+    return endpoint, ip
+
+
+async def probe_proxy(
+    proxy_config, endpoints=None, timeout: float | None = None
+) -> ProbeResult:
+    """
+    Testa o proxy disputando os endpoints de eco em paralelo: vale a primeira
+    resposta com o IP de saída e as demais requisições são canceladas.
+
+    Args:
+        proxy_config: Proxy no formato do Playwright
+        endpoints: Endpoints de eco. Se None, usa `ProxySettings.echo_endpoints`
+        timeout: Timeout (s). Se None, usa `ProxySettings.probe_timeout`
+    """
+    endpoints = endpoints or proxy_settings.echo_endpoints
+    timeout = timeout or proxy_settings.probe_timeout
+    server = proxy_config["server"]
+    errors = []
+
+    started = time.monotonic()
+    async with httpx.AsyncClient(
+        proxy=_proxy_url(proxy_config),
+        timeout=httpx.Timeout(timeout, connect=min(5.0, timeout)),
+    ) as client:
+        tasks = [asyncio.create_task(_echo(client, e)) for e in endpoints]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    endpoint, ip = await next_done
+                except Exception as err:
+                    errors.append(f"{type(err).__name__}: {err}"[:200])
+                    continue
+                return ProbeResult(
+                    server=server,
+                    ok=True,
+                    latency_ms=(time.monotonic() - started) * 1000,
+                    exit_ip=ip,
+                    endpoint=endpoint,
+                )
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return ProbeResult(server=server, ok=False, error="; ".join(errors))
+
+
+def load_probe_results(path=None, ttl: float | None = None) -> dict[str, ProbeResult]:
+    """Resultados salvos pelo prober com menos de `ttl` segundos"""
+    path = path or proxy_settings.probe_results_file
+    ttl = ttl or proxy_settings.probe_results_ttl
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as err:
+        logger.warning(f"Erro ao carregar resultados do prober: {err}")
+        return {}
+
+    now = time.time()
+    results = {}
+    for server, entry in data.items():
+        try:
+            result = ProbeResult(**entry)
+        except TypeError:
+            continue
+        if now - result.at < ttl:
+            results[server] = result
+    return results
+
+
+class ProxyProber:
+    """
+    Valida todos os proxies do arquivo em segundo plano, com no máximo
+    `concurrency` testes simultâneos (ver `probe_proxy`).
+
+    Cada resultado alimenta a saúde do proxy no `ProxyPool` e a rodada é salva
+    em `results_file`, que `get_proxy_pool` usa para pré-ordenar o pool quando
+    o worker reinicia. Com `PROXY_PROBE=true`, `get_proxy` inicia o prober.
+
+    Args:
+        pool: Pool de proxies. Se None, usa `get_proxy_pool()`
+        concurrency: Testes simultâneos. Se None, usa `ProxySettings.probe_concurrency`
+        interval: Intervalo (s) entre rodadas
+        results_file: Arquivo dos resultados
+    """
+
+    def __init__(
+        self,
+        pool: ProxyPool | None = None,
+        concurrency: int | None = None,
+        interval: float | None = None,
+        results_file: str | None = None,
+    ):
+        self.pool = pool or get_proxy_pool()
+        self.concurrency = concurrency or proxy_settings.probe_concurrency
+        self.interval = interval or proxy_settings.probe_interval
+        self.results_file = results_file or proxy_settings.probe_results_file
+        self.results: dict[str, ProbeResult] = load_probe_results(self.results_file)
+        self._task = None
+
+    async def _probe(self, record: ProxyRecord, semaphore) -> ProbeResult:
+        async with semaphore:
+            try:
+                result = await probe_proxy(record.config())
+            except Exception as err:
+                result = ProbeResult(server=record.server, ok=False, error=str(err))
+
+        self.pool.report(record.server, result.ok, result.latency_ms)
+        self.results[record.server] = result
+        return result
+
+    async def probe_all(self) -> list[ProbeResult]:
+        """Testa todos os proxies do arquivo e salva os resultados"""
+        await self.pool.refresh()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        records = self.pool.records
+
+        results = await asyncio.gather(*[self._probe(r, semaphore) for r in records])
+
+        servers = {record.server for record in records}
+        self.results = {s: r for s, r in self.results.items() if s in servers}
+        try:
+            await asyncio.to_thread(self._save, dict(self.results))
+        except OSError as err:
+            logger.warning(f"Erro ao salvar resultados do prober: {err}")
+
+        working = sum(result.ok for result in results)
+        logger.info(f"Prober: {working}/{len(results)} proxies funcionando")
+        return results
+
+    def _save(self, results: dict[str, ProbeResult]):
+        tmp_path = f"{self.results_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({s: asdict(r) for s, r in results.items()}, f)
+        os.replace(tmp_path, self.results_file)
+
+    def ranking(self) -> list[ProbeResult]:
+        """Proxies funcionando, do mais rápido ao mais lento"""
+        return sorted(
+            (r for r in self.results.values() if r.ok), key=lambda r: r.latency_ms
+        )
+
+    def start(self):
+        """Inicia as rodadas periódicas, se ainda não estiverem rodando"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as err:
+                logger.error(f"Erro na rodada do prober: {err}")
+            await asyncio.sleep(self.interval)
+
+
+_proxy_pool: ProxyPool | None = None
+_proxy_prober: ProxyProber | None = None
+
+
+def get_proxy_pool() -> ProxyPool:
+    """Retorna o pool global de proxies, pré-ordenado pelo último prober"""
+    global _proxy_pool
+
+    if _proxy_pool is None:
+        _proxy_pool = ProxyPool()
+        _proxy_pool.seed(load_probe_results())
+
+    return _proxy_pool
+
+
+def get_proxy_prober() -> ProxyProber:
+    """Retorna o prober global de proxies"""
+    global _proxy_prober
+
+    if _proxy_prober is None:
+        _proxy_prober = ProxyProber()
+
+    return _proxy_prober
+
+
+def report_proxy_result(proxy_config, success: bool, latency_ms: float | None = None):
+    """Alimenta a saúde do proxy com o resultado de uma navegação ou requisição"""
+    if proxy_config and (server := proxy_config.get("server")):
+        get_proxy_pool().report(server, success, latency_ms)
+
+
 def get_masked_proxy(proxy_config):
     """Exibe configuração do proxy ocultando informações sensíveis"""
     server = proxy_config.get("server", "N/A")
@@ -65,78 +531,37 @@ def print_final_result(retry_state):
     reraise=True,
 )
 async def get_proxy(test=False):
-    with open(proxy_settings.proxies_file, "r") as f:
-        lines = f.readlines()
-
-    line = random.choice(lines).strip()
-    ip, port, user, password = line.split(":")
+    if proxy_settings.probe:
+        get_proxy_prober().start()
 
-    proxy_config = {
-        "server": f"http://{ip}:{port}",
-        "username": user,
-        "password": password,
-    }
+    proxy_config = (await get_proxy_pool().random()).config()
 
     if test:
         try:
-            await test_proxy(proxy_config)
+            result = await probe_proxy(proxy_config)
         except Exception as err:
+            report_proxy_result(proxy_config, False)
             raise InvalidProxyError("Invalid proxy config") from err
+        report_proxy_result(proxy_config, result.ok, result.latency_ms)
+        _log_probe(result)
+        if not result.ok:
+            raise InvalidProxyError("Invalid proxy config")
 
     return proxy_config
 
 
-async def test_proxy(proxy_config):
-    """Testa se o proxy está funcionando com múltiplos endpoints"""
-
-    # Mascara o IP mantendo apenas os primeiros octetos
-    def mask_server(server_url):
-        import re
-
-        # Substitui os dois últimos octetos do IP por ***
-        return re.sub(r"(\d+\.\d+\.)\d+\.\d+", r"\1***.***", server_url)
-
-    proxy_url = f"http://{proxy_config['username']}:{proxy_config['password']}@{proxy_config['server'].replace('http://', '')}"
+def _log_probe(result: ProbeResult):
+    if result.ok:
+        logger.info(
+            f"Proxy funcionando. IP: {mask_ip(result.exit_ip)} "
+            f"(testado em {result.endpoint}, {result.latency_ms:.0f} ms)"
+        )
+    else:
+        logger.error(f"Proxy não funcionou em nenhum endpoint: {result.error}")
 
-    # Lista de endpoints para testar
-    test_endpoints = [
-        "http://httpbin.org/ip",
-        "http://ipinfo.io/json",
-        "https://api.ipify.org?format=json",
-    ]
 
-    async with httpx.AsyncClient(
-        proxy=proxy_url,  # Mudança aqui: proxy ao invés de proxies
-        timeout=httpx.Timeout(10.0, connect=5.0),
-    ) as client:
-        for endpoint in test_endpoints:
-            try:
-                response = await client.get(endpoint)
-
-                if response.status_code == 200:
-                    result = response.json()
-                    ip = result.get("origin") or result.get("ip")
-
-                    safe_server = mask_server(ip) if ip != "N/A" else "N/A"
-
-                    logger.info(
-                        f"Proxy funcionando. IP: {safe_server} (testado em {endpoint})"
-                    )
-                    return True
-                else:
-                    logger.info(
-                        f"Endpoint {endpoint} retornou status: {response.status_code}"
-                    )
-
-            except httpx.TimeoutException:
-                logger.error(f"Timeout no endpoint {endpoint}")
-                continue
-            except httpx.ProxyError as e:
-                logger.error(f"Erro de proxy no endpoint {endpoint}: {e}")
-                continue
-            except Exception as e:
-                logger.error(f"Erro no endpoint {endpoint}: {e}")
-                continue
-
-    logger.error("Proxy não funcionou em nenhum endpoint testado")
-    return False
+async def test_proxy(proxy_config):
+    """Testa se o proxy está funcionando com múltiplos endpoints"""
+    result = await probe_proxy(proxy_config)
+    _log_probe(result)
+    return result.ok
@@ -3,7 +3,7 @@ import base64
 from IPython.display import Image, display
 from loguru import logger
 
-from .browser import set_page
+from .metering import meter_fetch
 
 
 async def clear_headers(original_headers):
@@ -27,11 +27,20 @@ async def clear_headers(original_headers):
 
 
 async def perform_api_request(context, headers, endpoint):
-    """Realiza uma requisição GET para o endpoint usando os headers fornecidos."""
+    """
+    Realiza uma requisição GET para o endpoint usando os headers fornecidos.
+
+    Usa o cliente de requisições do próprio contexto (o mesmo de
+    `page.request`, com os mesmos cookies), sem abrir uma página por chamada.
+    """
     cleaned_headers = await clear_headers(headers)
-    api_page = await set_page(context)
     try:
-        response = await api_page.request.get(endpoint, headers=cleaned_headers)
+        try:
+            response = await context.request.get(endpoint, headers=cleaned_headers)
+        except Exception:
+            await meter_fetch(context, endpoint, request_headers=cleaned_headers)
+            raise
+        await meter_fetch(context, endpoint, response, cleaned_headers)
         if response.ok:
             return await response.json()
 
@@ -44,9 +53,6 @@ async def perform_api_request(context, headers, endpoint):
     except Exception as e:
         logger.error(f"Erro ao fazer a requisição: {str(e)}")
         return None
-    finally:
-        # Fecha a página da API
-        await api_page.close()
 
 
 def show_base64(base64_str: str):
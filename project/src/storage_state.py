@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from .config import browser_settings
+from .fingerprints import FingerprintProfile, get_fingerprint_pool
+from .host_stats import host_of
+
+INDEX_FILE = "index.json"
+
+
+def site_of(site: str) -> str:
+    """Normaliza uma URL ou host para o host usado como chave"""
+    return host_of(site) if "://" in site else site.lower()
+
+
+def _proxy_id(proxy) -> str:
+    # Só o hash do servidor vai para o índice, nunca o endereço ou credenciais
+    server = proxy.get("server", "") if proxy else ""
+    return hashlib.sha1(server.encode()).hexdigest()[:12] if server else "direct"
+
+
+class StorageStateStore:
+    """
+    Snapshots de `storage_state` (cookies e localStorage) por site, proxy e
+    perfil de fingerprint.
+
+    Restaurar o snapshot evita renegociar banners de consentimento, escolha de
+    região e cookies de desafio a cada contexto novo. A chave inclui o proxy e o
+    perfil porque esses cookies costumam estar amarrados ao IP e ao user agent.
+    Snapshots expiram após `ttl` segundos e os mais antigos são descartados
+    acima de `max_entries`.
+
+    Args:
+        directory: Diretório dos snapshots. Se None, usa `BrowserSettings.storage_state_dir`
+        ttl: Validade (s) de um snapshot
+        max_entries: Número máximo de snapshots guardados
+    """
+
+    def __init__(
+        self, directory=None, ttl: int | None = None, max_entries: int | None = None
+    ):
+        self.directory = Path(directory or browser_settings.storage_state_dir)
+        self.ttl = ttl or browser_settings.storage_state_ttl
+        self.max_entries = max_entries or browser_settings.storage_state_max_entries
+        self._index: dict[str, dict] = {}
+        self._load_index()
+
+    @staticmethod
+    def key(site: str, proxy, profile: FingerprintProfile) -> str:
+        raw = f"{site_of(site)}|{_proxy_id(proxy)}|{profile.id}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load_index(self):
+        try:
+            with open(self.directory / INDEX_FILE, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as err:
+            logger.warning(f"Erro ao carregar índice de storage states: {err}")
+
+    def _write(self, path: Path, data):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _read(self, path: Path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _fresh(self, entry: dict) -> bool:
+        return time.time() - entry["saved_at"] < self.ttl
+
+    def profile_for(self, site: str, proxy, engines) -> FingerprintProfile | None:
+        """
+        Perfil do snapshot válido mais recente do site e proxy, para que o
+        contexto novo reuse os cookies com o mesmo fingerprint.
+        """
+        site, proxy_id = site_of(site), _proxy_id(proxy)
+        candidates = [
+            entry
+            for entry in self._index.values()
+            if entry["site"] == site
+            and entry["proxy"] == proxy_id
+            and entry["engine"] in engines
+            and self._fresh(entry)
+        ]
+        for entry in sorted(candidates, key=lambda e: e["saved_at"], reverse=True):
+            if profile := get_fingerprint_pool().get(entry["profile_id"]):
+                return profile
+        return None
+
+    async def load(self, site: str, proxy, profile: FingerprintProfile):
+        """Snapshot válido para a chave, ou None"""
+        key = self.key(site, proxy, profile)
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        if not self._fresh(entry):
+            await self._drop([key])
+            return None
+
+        return await asyncio.to_thread(self._read, self._path(key))
+
+    async def save(self, context, site: str, proxy, profile: FingerprintProfile):
+        """Salva o storage state atual do contexto"""
+        key = self.key(site, proxy, profile)
+        try:
+            state = await context.storage_state()
+            await asyncio.to_thread(self._write, self._path(key), state)
+        except Exception as err:
+            logger.warning(f"Erro ao salvar storage state de {site_of(site)}: {err}")
+            return
+
+        self._index[key] = {
+            "site": site_of(site),
+            "proxy": _proxy_id(proxy),
+            "profile_id": profile.id,
+            "engine": profile.engine,
+            "saved_at": time.time(),
+        }
+
+        expired = [k for k, entry in self._index.items() if not self._fresh(entry)]
+        by_age = sorted(
+            (k for k in self._index if k not in expired),
+            key=lambda k: self._index[k]["saved_at"],
+        )
+        await self._drop(expired + by_age[: max(0, len(by_age) - self.max_entries)])
+
+    async def _drop(self, keys):
+        for key in keys:
+            self._index.pop(key, None)
+        index = dict(self._index)
+
+        def remove_files():
+            for key in keys:
+                try:
+                    self._path(key).unlink()
+                except OSError:
+                    pass
+            self._write(self.directory / INDEX_FILE, index)
+
+        try:
+            await asyncio.to_thread(remove_files)
+        except OSError as err:
+            logger.warning(f"Erro ao gravar índice de storage states: {err}")
+
+
+_storage_states: StorageStateStore | None = None
+
+
+def get_storage_states() -> StorageStateStore:
+    """Retorna o armazenamento global de storage states"""
+    global _storage_states
+
+    if _storage_states is None:
+        _storage_states = StorageStateStore()
+
+    return _storage_states
@@ -5,7 +5,6 @@ from urllib.parse import quote_plus, urlencode
 import bs4
 from bs4 import BeautifulSoup
 from loguru import logger
-from playwright.async_api import async_playwright
 from pydantic import BaseModel
 from tenacity import (
     retry,
@@ -14,8 +13,16 @@ from tenacity import (
     wait_exponential,
 )
 
-from ....browser import navigate_with_retry, set_browser, set_context, set_page
+from ....affinity import get_proxy_affinity
+from ....browser import (
+    get_browser_pool,
+    navigate_hedged,
+    navigate_with_retry,
+    set_page,
+    wait_for_dom_stable,
+)
 from ....clear_html import clean_html_for_llm
+from ....config import browser_settings, proxy_settings
 from ....proxies import get_proxy
 
 
@@ -62,8 +69,14 @@ async def search(
     async def process_search_type(_type: str):
         url = create_url(query, search_type=_type, region=region)
         logger.info(f"Generated url: '{url}'")
-        proxy_config = (await get_proxy(test=False)) if use_proxy else None
-        html_content = await _get_search_html(url, proxy_config=proxy_config)
+        # Com afinidade, o proxy é escolhido por domínio em `_get_search_html`
+        affinity = use_proxy and proxy_settings.affinity
+        proxy_config = (
+            (await get_proxy(test=False)) if use_proxy and not affinity else None
+        )
+        html_content = await _get_search_html(
+            url, proxy_config=proxy_config, affinity=affinity
+        )
         articles = await _get_articles_from_html(_type, html_content)
         result = await _parse_articles(_type, articles=articles)
         return result
@@ -108,16 +121,16 @@ async def _get_search_html(
     engine="firefox",
     timeouts=[60000, 90000, 120000],
     wait_time=0,
+    navigation_mode=None,
+    ready_selector="article",
+    hedge: bool | None = None,
+    affinity: bool = False,
 ):
-    async with async_playwright() as playwright:
-        browser = await set_browser(playwright, engine=engine, proxy=proxy_config)
-        context = await set_context(browser)
-        page = await set_page(context)
+    hedge = browser_settings.hedge_navigation if hedge is None else hedge
 
-        strategies = ["networkidle", "domcontentloaded", "load"]
-        await navigate_with_retry(
-            page, url, timeouts=timeouts, strategy_priority=strategies
-        )
+    async def extract_html(page):
+        if ready_selector:
+            await wait_for_dom_stable(page, selector=ready_selector)
 
         await asyncio.sleep(wait_time)
 
@@ -128,6 +141,41 @@ async def _get_search_html(
 
         return html_content
 
+    navigate_kwargs = dict(
+        timeouts=timeouts,
+        strategy_priority=["networkidle", "domcontentloaded", "load"],
+        mode=navigation_mode,
+        ready_selector=ready_selector,
+    )
+
+    if affinity and not hedge:
+        # Mesmo proxy, perfil e contexto das buscas anteriores no domínio
+        async with get_proxy_affinity().context(url, engine) as context:
+            page = await set_page(context)
+            await navigate_with_retry(page, url, **navigate_kwargs)
+            return await extract_html(page)
+
+    if affinity:
+        proxy_config = (await get_proxy_affinity().get(url, engine)).proxy
+
+    if hedge:
+        return await navigate_hedged(
+            url,
+            extract_html,
+            engine=engine,
+            proxy=proxy_config,
+            proxy_factory=get_proxy if proxy_config or affinity else None,
+            **navigate_kwargs,
+        )
+
+    pool = await get_browser_pool()
+
+    # Reaproveita cookies de consentimento/desafio de buscas anteriores
+    async with pool.context(engine, proxy=proxy_config, site=url) as context:
+        page = await set_page(context)
+        await navigate_with_retry(page, url, **navigate_kwargs)
+        return await extract_html(page)
+
 
 async def _parse_web_articles(articles: list[bs4.element.Tag]) -> list[SearchResult]:
     results = []
@@ -0,0 +1,110 @@
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+from loguru import logger
+
+from . import procfs
+from .config import browser_settings
+
+
+@dataclass
+class RecycleEvent:
+    """Reciclagem de um navegador pelo watchdog"""
+
+    engine: str
+    reason: str
+    rss_bytes: int
+    peak_rss_bytes: int
+    navigations: int
+    age_s: float
+    at: float
+
+
+class BrowserWatchdog:
+    """
+    Amostra o RSS da árvore de processos de cada navegador via /proc e decide
+    quando reciclá-lo, por teto de memória ou por número de navegações.
+
+    Navegadores conectados a servidores remotos não têm processos locais e só
+    são reciclados pelo número de navegações.
+
+    Args:
+        memory_limit_bytes: Teto de RSS por navegador
+        max_navigations: Navegações do frame principal antes de reciclar
+        interval: Intervalo (s) entre amostras
+        drain_timeout: Tempo (s) máximo esperando os contextos em uso terminarem
+        max_events: Eventos de reciclagem mantidos em memória
+    """
+
+    def __init__(
+        self,
+        memory_limit_bytes: int | None = None,
+        max_navigations: int | None = None,
+        interval: float | None = None,
+        drain_timeout: float | None = None,
+        max_events: int = 200,
+    ):
+        self.memory_limit_bytes = (
+            memory_limit_bytes or browser_settings.browser_memory_limit_mb * 2**20
+        )
+        self.max_navigations = (
+            max_navigations or browser_settings.browser_max_navigations
+        )
+        self.interval = interval or browser_settings.browser_watchdog_interval
+        self.drain_timeout = drain_timeout or browser_settings.browser_drain_timeout
+        self.events: deque[RecycleEvent] = deque(maxlen=max_events)
+        self.high_water: dict[str, int] = {}
+        self.recycled: dict[str, int] = {}
+
+    def inspect(self, browsers) -> list[tuple[object, str]]:
+        """
+        Atualiza o RSS dos navegadores e retorna os que devem ser reciclados
+        com o motivo ("memory" ou "navigations"). Lê o /proc: rode fora do
+        event loop.
+        """
+        children = procfs.children_map() if procfs.available() else {}
+        to_recycle = []
+
+        for pooled in browsers:
+            if pooled.pids and children:
+                pooled.rss_bytes = sum(
+                    procfs.tree_rss_bytes(pid, children) for pid in pooled.pids
+                )
+                pooled.peak_rss_bytes = max(pooled.peak_rss_bytes, pooled.rss_bytes)
+                self.high_water[pooled.engine] = max(
+                    self.high_water.get(pooled.engine, 0), pooled.rss_bytes
+                )
+
+            if pooled.retiring_since is not None:
+                continue
+            if pooled.rss_bytes > self.memory_limit_bytes:
+                to_recycle.append((pooled, "memory"))
+            elif pooled.navigations >= self.max_navigations:
+                to_recycle.append((pooled, "navigations"))
+
+        return to_recycle
+
+    def record(self, pooled, reason: str):
+        event = RecycleEvent(
+            engine=pooled.engine,
+            reason=reason,
+            rss_bytes=pooled.rss_bytes,
+            peak_rss_bytes=pooled.peak_rss_bytes,
+            navigations=pooled.navigations,
+            age_s=round(time.monotonic() - pooled.launched_at, 1),
+            at=time.time(),
+        )
+        self.events.append(event)
+        self.recycled[pooled.engine] = self.recycled.get(pooled.engine, 0) + 1
+        logger.info(
+            f"Reciclando navegador {pooled.engine} ({reason}): "
+            f"{pooled.rss_bytes / 2**20:.0f} MB, {pooled.navigations} navegações"
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "high_water_rss_bytes": dict(self.high_water),
+            "recycled": dict(self.recycled),
+            "events": [asdict(event) for event in self.events],
+        }